@@ -1,18 +1,44 @@
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 import sqlite3
 import json
 import os
-from datetime import datetime, timedelta
+import re
+import heapq
+import struct
+import sys
+import zlib
+from array import array
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import csv
 import io
-import shutil
 from pathlib import Path
 
-from pathlib import Path
+try:
+    import fcntl
+except ImportError:  # Windows - no cross-process lock, every worker schedules
+    fcntl = None
+
+from repository import MemoryBackend, ProgressRepository, ProgressRow, create_schema
+
 
+class AppJSONProvider(DefaultJSONProvider):
+    """JSON provider that also serializes repository rows (jsonify and |tojson)"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, ProgressRow):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
 
 
 app = Flask(__name__)
+app.json = AppJSONProvider(app)
 
 # Configure app paths
 BASE_DIR = Path(__file__).resolve().parent
@@ -35,14 +61,68 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 (STATIC_DIR / "chartjs").mkdir(parents=True, exist_ok=True)
 
 # Database and settings file paths
-DB_PATH = DATA_DIR / "peekaboo.db"
-SETTINGS_PATH = DATA_DIR / "settings.json"
+DB_FILENAME = "peekaboo.db"
+SETTINGS_FILENAME = "settings.json"
+DB_PATH = DATA_DIR / DB_FILENAME
+SETTINGS_PATH = DATA_DIR / SETTINGS_FILENAME
 BACKUP_DB_PATH = BACKUP_DIR / "peekaboo_backup.db"
 
+# Multi-athlete mode: each athlete gets their own SQLite shard under data/<athlete>/
+MULTI_ATHLETE = os.environ.get("PEEKABOO_MULTI_ATHLETE", "").lower() in ("1", "true", "yes")
+ATHLETE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+ATHLETE_COOKIE = "athlete"
+
+# In-memory mode keeps every shard in SQLite memory databases instead of files (tests, benchmarks)
+IN_MEMORY = os.environ.get("PEEKABOO_IN_MEMORY", "").lower() in ("1", "true", "yes")
+# Any object with repository(athlete, read_only) replaces the on-disk shards when set
+app.config['REPOSITORY_BACKEND'] = MemoryBackend() if IN_MEMORY else None
+
+# Open connection cache limits - idle shards are closed once these are exceeded
+CONNECTION_CACHE_SIZE = int(os.environ.get("PEEKABOO_CONNECTION_CACHE_SIZE", 64))
+CONNECTION_IDLE_SECONDS = int(os.environ.get("PEEKABOO_CONNECTION_IDLE_SECONDS", 300))
+# Per-connection SQLite page cache (KiB), kept small so hundreds of shards fit on one node
+SHARD_PAGE_CACHE_KIB = 512
+BACKUP_WORKERS = 8
+
+# Reminder scheduler - only the worker holding the lock file fires reminders
+REMINDER_SCHEDULER_ENABLED = os.environ.get("PEEKABOO_REMINDER_SCHEDULER", "1").lower() in ("1", "true", "yes")
+REMINDER_LOCK_PATH = DATA_DIR / "reminders.lock"
+REMINDER_LOG_PATH = DATA_DIR / "reminders.log"
+# How often settings changed by other workers are picked up (and followers retry the lock)
+REMINDER_RESYNC_SECONDS = 300
+
+# Background maintenance - retention archiving and bounded incremental vacuum
+MAINTENANCE_ENABLED = os.environ.get("PEEKABOO_MAINTENANCE", "1").lower() in ("1", "true", "yes")
+MAINTENANCE_LOCK_PATH = DATA_DIR / "maintenance.lock"
+MAINTENANCE_INTERVAL_SECONDS = 600
+# Each vacuum step frees at most this many pages; at most this many steps per run
+MAINTENANCE_VACUUM_PAGES = 256
+MAINTENANCE_VACUUM_STEPS = 16
+maintenance_wakeup = threading.Event()
 # App metadata
 APP_VERSION = "2.0.0"
 APP_NAME = "Peek-a-Boo Boxing Tracker"
 
+# Maximum rows returned / mutations accepted per /api/sync call
+SYNC_PAGE_SIZE = 500
+SYNC_RETENTION_DAYS = 30
+
+# Scores covered by /api/analytics and the percentiles reported for each
+ANALYTICS_METRICS = ('fluidity', 'endurance', 'power')
+ANALYTICS_PERCENTILES = (25, 50, 75, 90)
+STATS_RECENT_SESSIONS = 5
+
+# Program size (weeks x training days) of the dashboard completion bitmaps
+PROGRAM_WEEKS = 6
+PROGRAM_DAYS = 5
+
+# Per-round session telemetry, stored as one packed blob per session
+TELEMETRY_FIELDS = ('work_seconds', 'rest_seconds', 'intensity', 'punches')
+TELEMETRY_FORMAT_VERSION = 1
+TELEMETRY_HEADER = '<BI'
+TELEMETRY_MAX_ROUNDS = 1000
+TELEMETRY_MAX_VALUE = 2 ** 31 - 1
+
 # Default settings
 DEFAULT_SETTINGS = {
     "training_time": "09:00",
@@ -51,14 +131,47 @@ DEFAULT_SETTINGS = {
     "sound_enabled": True,
     "theme": "light",
     "auto_backup": True,
-    "max_backups": 10
+    "max_backups": 10,
+    "retention_days": 0
 }
 
-def load_settings():
+def current_athlete():
+    """Return the athlete routed for this request (None outside multi-athlete mode)"""
+    if has_request_context():
+        return g.get('athlete')
+    return None
+
+def get_shard_dir(athlete=None):
+    """Return the data directory holding an athlete's database and settings"""
+    athlete = athlete or current_athlete()
+    return DATA_DIR / athlete if athlete else DATA_DIR
+
+def get_db_path(athlete=None):
+    """Return the SQLite shard path for an athlete (the shared database in single-athlete mode)"""
+    return get_shard_dir(athlete) / DB_FILENAME
+
+def get_settings_path(athlete=None):
+    """Return the settings file path for an athlete"""
+    return get_shard_dir(athlete) / SETTINGS_FILENAME
+
+def get_backup_dir(athlete=None):
+    """Return the backup directory for an athlete"""
+    athlete = athlete or current_athlete()
+    return BACKUP_DIR / athlete if athlete else BACKUP_DIR
+
+def list_athletes():
+    """List athletes that have a database shard (None stands for the single-athlete database)"""
+    if not MULTI_ATHLETE:
+        return [None]
+    return sorted(p.name for p in DATA_DIR.iterdir()
+                  if p.is_dir() and ATHLETE_ID_PATTERN.match(p.name) and (p / DB_FILENAME).exists())
+
+def load_settings(athlete=None):
     """Load settings from JSON file"""
-    if SETTINGS_PATH.exists():
+    settings_path = get_settings_path(athlete)
+    if settings_path.exists():
         try:
-            with open(SETTINGS_PATH, 'r') as f:
+            with open(settings_path, 'r') as f:
                 settings = json.load(f)
                 # Merge with defaults in case new settings were added
                 return {**DEFAULT_SETTINGS, **settings}
@@ -66,76 +179,271 @@ def load_settings():
             return DEFAULT_SETTINGS.copy()
     return DEFAULT_SETTINGS.copy()
 
-def save_settings(settings):
+def save_settings(settings, athlete=None):
     """Save settings to JSON file"""
-    with open(SETTINGS_PATH, 'w') as f:
+    with open(get_settings_path(athlete), 'w') as f:
         json.dump(settings, f, indent=4)
 
-def get_db_connection():
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection whose close() hands it back to the connection cache"""
+
+    shard = None
+    cache = None
+
+    def close(self):
+        if self.cache is None:
+            super().close()
+        else:
+            self.cache.release(self)
+
+    def dispose(self):
+        """Really close the underlying connection"""
+        self.cache = None
+        super().close()
+
+class ConnectionCache:
+    """LRU-bounded cache of idle SQLite connections, keyed by shard path.
+
+    A connection is checked out by exactly one request at a time; close()
+    returns it here. Least recently used shards are closed once more than
+    max_size connections are idle, or after idle_seconds without use.
+    A read_only cache opens shards with mode=ro and never creates schema.
+    """
+
+    def __init__(self, max_size, idle_seconds, read_only=False):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self.read_only = read_only
+        self._idle = OrderedDict()
+        self._idle_count = 0
+        self._initialized = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, db_path):
+        shard = str(db_path)
+        with self._lock:
+            self._evict_expired()
+            connections = self._idle.get(shard)
+            conn = connections.pop()[0] if connections else None
+            if conn is not None:
+                self._idle_count -= 1
+                if not connections:
+                    del self._idle[shard]
+            needs_schema = shard not in self._initialized and not self.read_only
+
+        if conn is None:
+            if self.read_only:
+                conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True,
+                                       factory=PooledConnection, check_same_thread=False)
+            else:
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(db_path, factory=PooledConnection, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if MULTI_ATHLETE:
+                conn.execute(f"PRAGMA cache_size = -{SHARD_PAGE_CACHE_KIB}")
+            conn.shard = shard
+            conn.cache = self
+
+        if needs_schema:
+            try:
+                create_schema(conn)
+            except sqlite3.Error:
+                # Never pool (or leave open) a connection whose schema setup failed
+                conn.dispose()
+                raise
+            with self._lock:
+                self._initialized.add(shard)
+        return conn
+
+    def release(self, conn):
+        # Never hand an open transaction to the next request
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._idle.setdefault(conn.shard, []).append((conn, time.monotonic()))
+            self._idle.move_to_end(conn.shard)
+            self._idle_count += 1
+            self._evict_expired()
+            while self._idle_count > self.max_size:
+                self._evict_oldest()
+
+    def discard(self, db_path):
+        """Close idle connections to a shard whose file was replaced (e.g. restored from backup)"""
+        shard = str(db_path)
+        with self._lock:
+            for conn, _ in self._idle.pop(shard, []):
+                conn.dispose()
+                self._idle_count -= 1
+            self._initialized.discard(shard)
+
+    def is_initialized(self, db_path):
+        return str(db_path) in self._initialized
+
+    def _evict_oldest(self):
+        shard, connections = next(iter(self._idle.items()))
+        conn, _ = connections.pop(0)
+        conn.dispose()
+        self._idle_count -= 1
+        if not connections:
+            del self._idle[shard]
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._idle:
+            shard, connections = next(iter(self._idle.items()))
+            if connections[-1][1] >= cutoff:
+                break
+            for conn, _ in connections:
+                conn.dispose()
+            self._idle_count -= len(connections)
+            del self._idle[shard]
+
+class VersionedShardCache:
+    """LRU-bounded cache of one computed value per shard, tagged with its data version.
+
+    Request threads share it, so lookups and stores hold a lock; computing a
+    value happens outside it, and a racing store of the same version is harmless.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, shard, version):
+        """Return the value cached for this shard and data version, or None"""
+        with self._lock:
+            entry = self._entries.get(shard)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(shard)
+            return entry[1]
+
+    def put(self, shard, version, value):
+        with self._lock:
+            self._entries[shard] = (version, value)
+            self._entries.move_to_end(shard)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+connection_cache = ConnectionCache(CONNECTION_CACHE_SIZE, CONNECTION_IDLE_SECONDS)
+read_connection_cache = ConnectionCache(CONNECTION_CACHE_SIZE, CONNECTION_IDLE_SECONDS, read_only=True)
+
+# Memoized /api/analytics results and dashboard completion bitmaps, bounded to the
+# same number of shards the connection cache keeps warm
+_analytics_cache = VersionedShardCache(CONNECTION_CACHE_SIZE)
+_completion_cache = VersionedShardCache(CONNECTION_CACHE_SIZE)
+
+def is_corruption_error(error):
+    """True only for errors that mean the database file itself is damaged"""
+    code = getattr(error, 'sqlite_errorcode', None)
+    return code is not None and code & 0xff in (sqlite3.SQLITE_CORRUPT, sqlite3.SQLITE_NOTADB)
+
+def get_db_connection(athlete=None):
     """Get database connection with proper error handling"""
+    db_path = get_db_path(athlete)
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return connection_cache.acquire(db_path)
     except sqlite3.Error as e:
         print(f"Database connection error: {e}")
+        # Locks, migration errors and the like are not a reason to overwrite the database
+        if not is_corruption_error(e):
+            raise
         # Try to restore from backup if available
-        restore_from_latest_backup()
+        restore_from_latest_backup(athlete)
         # Try again
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return connection_cache.acquire(db_path)
 
-def restore_from_latest_backup():
+def restore_from_latest_backup(athlete=None):
     """Restore database from latest backup if main DB is corrupted"""
     try:
-        backups = sorted(BACKUP_DIR.glob("peekaboo_backup_*.db"))
+        backups = sorted(get_backup_dir(athlete).glob("peekaboo_backup_*.db"))
         if backups:
             latest_backup = backups[-1]
-            shutil.copy2(latest_backup, DB_PATH)
+            replace_database_file(latest_backup, athlete)
             print(f"Restored database from backup: {latest_backup.name}")
     except Exception as e:
         print(f"Failed to restore from backup: {e}")
 
-def init_db():
+def replace_database_file(source, athlete=None):
+    """Restore a shard from another database file through SQLite's backup API.
+
+    The pages are copied into the live database as one write transaction, so
+    pooled connections and open report snapshots stay valid and the WAL is
+    never pulled out from under them. Only a shard that is no longer a
+    readable database is moved aside (kept as *.corrupt) and rebuilt.
+    """
+    db_path = get_db_path(athlete)
+    source_conn = sqlite3.connect(f"{Path(source).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        # Check the source first, so a bad upload is never mistaken for a damaged shard
+        if source_conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+            raise sqlite3.DatabaseError(f"{Path(source).name} failed its integrity check")
+        try:
+            copy_database(source_conn, db_path)
+        except sqlite3.Error as e:
+            if not is_corruption_error(e):
+                raise
+            connection_cache.discard(db_path)
+            read_connection_cache.discard(db_path)
+            for suffix in ("", "-wal", "-shm"):
+                damaged = Path(f"{db_path}{suffix}")
+                if damaged.exists():
+                    damaged.replace(f"{damaged}.corrupt")
+            copy_database(source_conn, db_path)
+    finally:
+        source_conn.close()
+
+    # The restored file may predate the current schema; rerun migrations on next use
+    connection_cache.discard(db_path)
+    read_connection_cache.discard(db_path)
+
+    # The change log was rewound with the file, so sync clients must start over
+    repo = get_repository(athlete)
+    repo.reset_sync_epoch()
+    repo.commit()
+    repo.close()
+
+def copy_database(source_conn, db_path):
+    """Copy every page of source_conn into the database at db_path"""
+    live_conn = sqlite3.connect(db_path)
+    try:
+        source_conn.backup(live_conn)
+    finally:
+        live_conn.close()
+
+def get_repository(athlete=None):
+    """Get a ProgressRepository over a pooled connection; close() returns the connection"""
+    backend = app.config.get('REPOSITORY_BACKEND')
+    if backend is not None:
+        return backend.repository(athlete or current_athlete())
+    return ProgressRepository(get_db_connection(athlete))
+
+def get_report_repository(athlete=None):
+    """Get a ProgressRepository over a pooled read-only connection for reports.
+
+    Wrap the reads in repo.snapshot() so they share one WAL snapshot; a report
+    never takes the write lock or sees half of a concurrent save.
+    """
+    backend = app.config.get('REPOSITORY_BACKEND')
+    if backend is not None:
+        return backend.repository(athlete or current_athlete(), read_only=True)
+
+    db_path = get_db_path(athlete)
+    # The read-only pool can't create the file or schema, so let the writer pool do it first
+    if not connection_cache.is_initialized(db_path):
+        get_db_connection(athlete).close()
+    return ProgressRepository(read_connection_cache.acquire(db_path))
+
+def init_db(athlete=None):
     """Initialize database with required tables"""
     try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        
-        # Progress table
-        c.execute('''CREATE TABLE IF NOT EXISTS progress
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                      week INTEGER, 
-                      day INTEGER, 
-                      fluidity INTEGER, 
-                      endurance INTEGER, 
-                      power INTEGER, 
-                      date TEXT,
-                      notes TEXT,
-                      duration INTEGER DEFAULT 0,
-                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-        
-        # Sessions table for tracking completion
-        c.execute('''CREATE TABLE IF NOT EXISTS sessions
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                      week INTEGER,
-                      day INTEGER,
-                      completed_date TEXT,
-                      duration INTEGER,
-                      UNIQUE(week, day))''')
-        
-        # Create indexes for better performance
-        c.execute('''CREATE INDEX IF NOT EXISTS idx_progress_week_day ON progress(week, day)''')
-        c.execute('''CREATE INDEX IF NOT EXISTS idx_progress_date ON progress(date)''')
-        c.execute('''CREATE INDEX IF NOT EXISTS idx_sessions_week_day ON sessions(week, day)''')
-        
-        conn.commit()
-        conn.close()
+        # Opening the shard (or in-memory database) creates its schema
+        get_repository(athlete).close()
         
         # Initialize settings file if it doesn't exist
-        if not SETTINGS_PATH.exists():
-            save_settings(DEFAULT_SETTINGS)
+        if not get_settings_path(athlete).exists():
+            save_settings(DEFAULT_SETTINGS, athlete)
             
         print("✅ Database initialized successfully")
         return True
@@ -143,19 +451,35 @@ def init_db():
         print(f"❌ Database initialization failed: {e}")
         return False
 
-def backup_database():
+def backup_database(athlete=None):
     """Create a backup of the database"""
     try:
-        if not DB_PATH.exists():
+        if app.config.get('REPOSITORY_BACKEND') is not None:
+            # Injected backends (e.g. in-memory) have no shard file to copy
+            return None
+
+        db_path = get_db_path(athlete)
+        if not db_path.exists():
             print("No database file to backup")
             return None
             
+        backup_dir = get_backup_dir(athlete)
+        backup_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = BACKUP_DIR / f"peekaboo_backup_{timestamp}.db"
-        shutil.copy2(DB_PATH, backup_file)
+        backup_file = backup_dir / f"peekaboo_backup_{timestamp}.db"
+
+        # Copy through SQLite so commits still sitting in the WAL are included
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(backup_file)
+        try:
+            source.backup(target)
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            source.close()
         
         # Clean up old backups
-        cleanup_old_backups()
+        cleanup_old_backups(athlete)
         
         print(f"✅ Database backed up: {backup_file.name}")
         return str(backup_file)
@@ -163,13 +487,19 @@ def backup_database():
         print(f"❌ Backup failed: {e}")
         return None
 
-def cleanup_old_backups():
+def backup_all_shards():
+    """Back up every athlete's shard in parallel, returning {athlete: backup file or None}"""
+    athletes = list_athletes()
+    with ThreadPoolExecutor(max_workers=min(BACKUP_WORKERS, max(len(athletes), 1))) as pool:
+        return dict(zip(athletes, pool.map(backup_database, athletes)))
+
+def cleanup_old_backups(athlete=None):
     """Keep only recent backups based on settings"""
     try:
-        settings = load_settings()
+        settings = load_settings(athlete)
         max_backups = settings.get('max_backups', 10)
         
-        backups = sorted(BACKUP_DIR.glob("peekaboo_backup_*.db"))
+        backups = sorted(get_backup_dir(athlete).glob("peekaboo_backup_*.db"))
         if len(backups) > max_backups:
             for old_backup in backups[:-max_backups]:
                 old_backup.unlink()
@@ -177,22 +507,238 @@ def cleanup_old_backups():
     except Exception as e:
         print(f"Backup cleanup error: {e}")
 
-def send_reminder_if_needed():
-    """Send reminder if enabled and training time is approaching"""
+# Stand-in "lock" handed out where fcntl is unavailable (e.g. Windows)
+UNLOCKED_LEADER = object()
+
+def acquire_leader_lock(lock_path):
+    """Try to take an exclusive, non-blocking lock so only one worker runs a background job.
+
+    Returns the open lock file (keep it referenced to hold the lock), or None
+    if another process holds it. Without fcntl there is no cross-process lock:
+    UNLOCKED_LEADER is returned and every worker counts as the leader, so each
+    one fires reminders and runs maintenance. Run a single worker there.
+    """
+    if fcntl is None:
+        return UNLOCKED_LEADER
+    lock_file = open(lock_path, 'a')
     try:
-        settings = load_settings()
-        if not settings.get('reminder_enabled', True):
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def archive_old_progress(repo, retention_days):
+    """Roll progress rows older than the retention window into per-week archive rows"""
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+    return repo.archive_before(cutoff)
+
+def incremental_vacuum(repo, max_steps=MAINTENANCE_VACUUM_STEPS):
+    """Release free pages back to the filesystem in bounded steps, returning bytes reclaimed"""
+    reclaimed = 0
+    for _ in range(max_steps):
+        free_pages, page_size = repo.free_pages()
+        if not free_pages:
+            break
+        repo.incremental_vacuum(MAINTENANCE_VACUUM_PAGES)
+        reclaimed += (free_pages - repo.free_pages()[0]) * page_size
+
+    if reclaimed:
+        repo.add_maintenance_stat('reclaimed_bytes', reclaimed)
+        repo.commit()
+    return reclaimed
+
+def run_maintenance(athlete=None):
+    """Apply the retention policy and reclaim free pages for one shard"""
+    settings = load_settings(athlete)
+    retention_days = int(settings.get('retention_days') or 0)
+
+    repo = get_repository(athlete)
+    try:
+        archived = archive_old_progress(repo, retention_days) if retention_days > 0 else 0
+        compacted = repo.compact_sync_log(SYNC_RETENTION_DAYS)
+        reclaimed = incremental_vacuum(repo)
+    finally:
+        repo.close()
+
+    if archived or compacted or reclaimed:
+        print(f"🧹 Maintenance ({athlete or 'default'}): archived {archived} rows, "
+              f"compacted {compacted} sync rows, reclaimed {reclaimed} bytes")
+    return {"archived_rows": archived, "compacted_sync_rows": compacted, "reclaimed_bytes": reclaimed}
+
+def maintenance_loop():
+    """Background maintenance, run by whichever worker holds the maintenance lock"""
+    lock = None
+    while True:
+        if lock is None:
+            lock = acquire_leader_lock(MAINTENANCE_LOCK_PATH)
+        if lock is not None:
+            for athlete in list_athletes():
+                try:
+                    run_maintenance(athlete)
+                except Exception as e:
+                    print(f"Maintenance error: {e}")
+        maintenance_wakeup.wait(MAINTENANCE_INTERVAL_SECONDS)
+        maintenance_wakeup.clear()
+
+def parse_training_time(value):
+    """Return (hour, minute) for an 'HH:MM' training time, raising ValueError otherwise"""
+    parsed = datetime.strptime(str(value).strip(), '%H:%M')
+    return parsed.hour, parsed.minute
+
+def next_reminder_time(settings, now=None):
+    """Return the next training reminder as an aware UTC datetime, in the user's timezone"""
+    try:
+        tz = ZoneInfo(settings.get('timezone', 'Africa/Lagos'))
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = timezone.utc
+
+    try:
+        hour, minute = parse_training_time(settings.get('training_time', DEFAULT_SETTINGS['training_time']))
+    except ValueError:
+        # Hand-edited settings files can hold anything; remind at the default time instead
+        hour, minute = parse_training_time(DEFAULT_SETTINGS['training_time'])
+    local_now = (now or datetime.now(timezone.utc)).astimezone(tz)
+    fire_at = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if fire_at <= local_now:
+        fire_at = datetime.combine(local_now.date() + timedelta(days=1), fire_at.timetz())
+    return fire_at.astimezone(timezone.utc)
+
+def file_notifier(athlete, settings, fire_at):
+    """Local stand-in notifier - appends the reminder to data/reminders.log"""
+    message = (f"{fire_at.isoformat()} ⏰ Training reminder for {athlete or 'default'}: "
+               f"session at {settings.get('training_time', '09:00')} ({settings.get('timezone', 'Africa/Lagos')})")
+    with open(REMINDER_LOG_PATH, 'a') as f:
+        f.write(message + "\n")
+    print(message)
+
+class ReminderScheduler:
+    """Background reminder scheduler built on a min-heap of next-fire times.
+
+    Each athlete has one live heap entry; rescheduling pushes a new entry
+    and the superseded one is skipped when it reaches the top, so every
+    change costs O(log n). Only the worker holding the leader lock fires
+    reminders. `notifier(athlete, settings, fire_at)` delivers them.
+    """
+
+    def __init__(self, notifier, lock_path):
+        self.notifier = notifier
+        self.lock_path = lock_path
+        self._heap = []
+        self._entries = {}
+        self._settings_mtimes = {}
+        self._condition = threading.Condition()
+        self._lock_file = None
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self._lock_file is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def next_fire(self, athlete=None):
+        """Return the scheduled UTC fire time for an athlete, if this worker fires it and it is still ahead.
+
+        Followers (and workers with the scheduler off) also fill entries via
+        reschedule(), but only the leader moves one forward after it fires, so
+        theirs go stale; callers fall back to next_reminder_time() on None.
+        """
+        entry = self._entries.get(athlete or '')
+        if not self.is_leader or not entry or entry <= time.time():
+            return None
+        return datetime.fromtimestamp(entry, timezone.utc)
+
+    def reschedule(self, athlete=None):
+        """Recompute the entry for one athlete after their settings changed"""
+        with self._condition:
+            self._schedule(athlete)
+            self._condition.notify()
+
+    def _schedule(self, athlete):
+        key = athlete or ''
+        settings_path = get_settings_path(athlete)
+        self._settings_mtimes[key] = settings_path.stat().st_mtime_ns if settings_path.exists() else 0
+
+        try:
+            settings = load_settings(athlete)
+            if not settings.get('reminder_enabled', True):
+                self._entries.pop(key, None)
+                return
+            fire_at = next_reminder_time(settings).timestamp()
+        except Exception as e:
+            # One athlete's bad settings must not stop reminders for everyone else
+            print(f"Reminder scheduling error for {athlete or 'default'}: {e}")
+            self._entries.pop(key, None)
             return
-            
-        # Simple reminder logic - you can enhance this with actual notifications
-        training_time = settings.get('training_time', '09:00')
-        current_time = datetime.now().strftime('%H:%M')
-        
-        # For demo purposes, just log the reminder check
-        print(f"⏰ Reminder check: Current time {current_time}, Training time {training_time}")
-        
-    except Exception as e:
-        print(f"Reminder error: {e}")
+        self._entries[key] = fire_at
+        heapq.heappush(self._heap, (fire_at, key))
+
+        # Drop superseded entries once they outnumber the live ones
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [(fire_at, key) for key, fire_at in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _resync(self):
+        """Reschedule athletes whose settings file changed in another worker"""
+        try:
+            athletes = list_athletes()
+        except OSError as e:
+            print(f"Reminder resync error: {e}")
+            return
+
+        for athlete in athletes:
+            try:
+                settings_path = get_settings_path(athlete)
+                mtime = settings_path.stat().st_mtime_ns if settings_path.exists() else 0
+            except OSError as e:
+                print(f"Reminder resync error for {athlete or 'default'}: {e}")
+                continue
+            if self._settings_mtimes.get(athlete or '') != mtime:
+                self._schedule(athlete)
+
+    def _try_become_leader(self):
+        self._lock_file = acquire_leader_lock(self.lock_path)
+        return self._lock_file is not None
+
+    def _run(self):
+        while not self._try_become_leader():
+            time.sleep(REMINDER_RESYNC_SECONDS)
+        print("⏰ Reminder scheduler started")
+        if self._lock_file is UNLOCKED_LEADER:
+            print("⚠️  No fcntl on this platform - every worker fires reminders; run a single worker")
+
+        next_resync = 0
+        while True:
+            due = []
+            with self._condition:
+                now = time.time()
+                if now >= next_resync:
+                    self._resync()
+                    next_resync = now + REMINDER_RESYNC_SECONDS
+
+                while self._heap and self._heap[0][0] <= now:
+                    fire_at, key = heapq.heappop(self._heap)
+                    if self._entries.get(key) == fire_at:
+                        due.append((key, fire_at))
+
+                if not due:
+                    wake_at = min(self._heap[0][0] if self._heap else next_resync, next_resync)
+                    self._condition.wait(max(wake_at - now, 0))
+                    continue
+
+            for key, fire_at in due:
+                athlete = key or None
+                try:
+                    self.notifier(athlete, load_settings(athlete), datetime.fromtimestamp(fire_at, timezone.utc))
+                except Exception as e:
+                    print(f"Reminder error: {e}")
+                self.reschedule(athlete)
+
+reminder_scheduler = ReminderScheduler(file_notifier, REMINDER_LOCK_PATH)
 
 # Training program data (MUST BE COMPLETED - This is a placeholder; replace with your full TRAINING_DATA)
 TRAINING_DATA = {
@@ -231,24 +777,90 @@ TRAINING_DATA = {
     # 6: { ... },
 }
 
-# Initialize database on startup
-if not init_db():
+def completion_bit(week, day):
+    """Bit position of a program session in the completion bitmap"""
+    return (week - 1) * PROGRAM_DAYS + (day - 1)
+
+def get_completion_bitmap(repo):
+    """Return completed program sessions packed into an int, cached per shard by data version"""
+    shard = str(get_db_path())
+    version = get_data_version(repo)
+    bitmap = _completion_cache.get(shard, version)
+    if bitmap is not None:
+        return bitmap
+
+    # sessions holds at most one row per program slot, so this is bounded by program size
+    bitmap = 0
+    for week, day in repo.completed_slots(PROGRAM_WEEKS, PROGRAM_DAYS):
+        bitmap |= 1 << completion_bit(week, day)
+
+    _completion_cache.put(shard, version, bitmap)
+    return bitmap
+
+# Initialize database on startup (athlete shards are initialized on first use)
+if not MULTI_ATHLETE and not init_db():
     print("⚠️  Retrying database initialization...")
     init_db()
 
+if REMINDER_SCHEDULER_ENABLED:
+    reminder_scheduler.start()
+
+if MAINTENANCE_ENABLED:
+    threading.Thread(target=maintenance_loop, name="maintenance", daemon=True).start()
+
+@app.before_request
+def route_athlete():
+    """Pick the athlete shard for this request in multi-athlete mode"""
+    if not MULTI_ATHLETE or request.endpoint in ('static', 'select_athlete', 'create_all_backups'):
+        return None
+
+    athlete = (request.headers.get('X-Athlete')
+               or request.args.get('athlete')
+               or request.cookies.get(ATHLETE_COOKIE))
+    if not athlete or not ATHLETE_ID_PATTERN.match(athlete):
+        return jsonify({"error": "A valid athlete must be selected (X-Athlete header, ?athlete= or /athlete/<id>)"}), 400
+
+    g.athlete = athlete
+    ensure_athlete_shard(athlete)
+    return None
+
+def ensure_athlete_shard(athlete):
+    """Create an athlete's shard and reminder entry on first use"""
+    if not get_settings_path(athlete).exists():
+        init_db(athlete)
+        reminder_scheduler.reschedule(athlete)
+
+@app.route('/athlete/<athlete_id>')
+def select_athlete(athlete_id):
+    """Remember the selected athlete in a cookie and go to their dashboard"""
+    if not MULTI_ATHLETE:
+        return redirect(url_for('index'))
+    if not ATHLETE_ID_PATTERN.match(athlete_id):
+        return render_template('404.html', message="Athlete not found"), 404
+
+    response = redirect(url_for('index'))
+    response.set_cookie(ATHLETE_COOKIE, athlete_id, samesite='Lax')
+    return response
+
 @app.route('/')
 def index():
     """Dashboard view - This is already the default route rendering dashboard.html"""
     try:
-        conn = get_db_connection()
-        progress_data = conn.execute("SELECT week, day FROM progress ORDER BY week, day").fetchall()
-        conn.close()
+        repo = get_repository()
+        bitmap = get_completion_bitmap(repo)
+        repo.close()
         
-        completed_sessions = {(row['week'], row['day']) for row in progress_data}
+        completed_sessions = {
+            (week, day)
+            for week in range(1, PROGRAM_WEEKS + 1)
+            for day in range(1, PROGRAM_DAYS + 1)
+            if bitmap >> completion_bit(week, day) & 1
+        }
         
         return render_template('dashboard.html', 
-                             weeks=range(1, 7),
+                             weeks=range(1, PROGRAM_WEEKS + 1),
                              completed_sessions=completed_sessions,
+                             completion_bitmap=bitmap,
                              training_data=TRAINING_DATA)
     except Exception as e:
         return render_template('500.html', error=str(e)), 500
@@ -265,21 +877,18 @@ def session(week, day):
         session_data = TRAINING_DATA[week][day]
         
         # Get existing progress
-        conn = get_db_connection()
-        result = conn.execute(
-            "SELECT fluidity, endurance, power, notes, duration FROM progress WHERE week=? AND day=?",
-            (week, day)
-        ).fetchone()
-        conn.close()
+        repo = get_repository()
+        result = repo.find_session(week, day)
+        repo.close()
         
         existing_progress = None
         if result:
             existing_progress = {
-                "fluidity": result['fluidity'],
-                "endurance": result['endurance'],
-                "power": result['power'],
-                "notes": result['notes'],
-                "duration": result['duration']
+                "fluidity": result.fluidity,
+                "endurance": result.endurance,
+                "power": result.power,
+                "notes": result.notes,
+                "duration": result.duration
             }
         
         settings = load_settings()
@@ -306,13 +915,10 @@ def save_progress():
         notes = data.get('notes', '')
         duration = data.get('duration', 0)
         
-        conn = get_db_connection()
-        conn.execute('''INSERT OR REPLACE INTO progress 
-                        (week, day, fluidity, endurance, power, date, notes, duration) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                     (week, day, fluidity, endurance, power, datetime.now().isoformat(), notes, duration))
-        conn.commit()
-        conn.close()
+        repo = get_repository()
+        repo.add(week, day, fluidity, endurance, power, datetime.now().isoformat(), notes, duration, replace=True)
+        repo.commit()
+        repo.close()
         
         # Create automatic backup if enabled
         settings = load_settings()
@@ -340,13 +946,10 @@ def add_manual_session():
         if not week or not day:
             return jsonify({"success": False, "error": "Week and day are required"}), 400
         
-        conn = get_db_connection()
-        conn.execute('''INSERT INTO progress 
-                        (week, day, fluidity, endurance, power, date, notes, duration) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                     (week, day, fluidity, endurance, power, custom_date, notes, duration))
-        conn.commit()
-        conn.close()
+        repo = get_repository()
+        repo.add(week, day, fluidity, endurance, power, custom_date, notes, duration)
+        repo.commit()
+        repo.close()
         
         return jsonify({"success": True})
     except Exception as e:
@@ -356,10 +959,10 @@ def add_manual_session():
 def delete_session(session_id):
     """Delete a workout session"""
     try:
-        conn = get_db_connection()
-        conn.execute("DELETE FROM progress WHERE id = ?", (session_id,))
-        conn.commit()
-        conn.close()
+        repo = get_repository()
+        repo.delete(session_id)
+        repo.commit()
+        repo.close()
         
         return jsonify({"success": True})
     except Exception as e:
@@ -369,36 +972,15 @@ def delete_session(session_id):
 def progress():
     """Progress tracking and analytics view"""
     try:
-        conn = get_db_connection()
+        repo = get_report_repository()
         
         # Get filter parameters
         week_filter = request.args.get('week', type=int)
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
         
-        # Build query with filters
-        query = "SELECT id, week, day, fluidity, endurance, power, date, notes, duration FROM progress"
-        params = []
-        where_clauses = []
-        
-        if week_filter:
-            where_clauses.append("week = ?")
-            params.append(week_filter)
-        
-        if date_from:
-            where_clauses.append("date >= ?")
-            params.append(date_from)
-            
-        if date_to:
-            where_clauses.append("date <= ?")
-            params.append(date_to)
-        
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-        
-        query += " ORDER BY date DESC, week DESC, day DESC"
-        
-        data = conn.execute(query, params).fetchall()
+        with repo.snapshot():
+            data = repo.list_progress(week_filter, date_from, date_to, order='recent')
         
         # Calculate statistics
         if data:
@@ -430,7 +1012,7 @@ def progress():
             avg_fluidity = avg_endurance = avg_power = total_duration = total_sessions = 0
             weekly_stats = {}
         
-        conn.close()
+        repo.close()
         
         return render_template('progress.html',
                              progress_data=data,
@@ -450,7 +1032,7 @@ def progress():
 def export():
     """Export options view"""
     try:
-        backups = sorted(BACKUP_DIR.glob("peekaboo_backup_*.db"), reverse=True)
+        backups = sorted(get_backup_dir().glob("peekaboo_backup_*.db"), reverse=True)
         backup_list = [{"name": b.name, "date": datetime.fromtimestamp(b.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")} for b in backups[:10]]
         
         return render_template('export.html', backups=backup_list)
@@ -465,36 +1047,14 @@ def test500():
 def export_progress_csv():
     """Export progress data as CSV"""
     try:
-        conn = get_db_connection()
-        
         # Get filter parameters for export
         week_filter = request.args.get('week', type=int)
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
         
-        query = "SELECT week, day, fluidity, endurance, power, date, notes, duration FROM progress"
-        params = []
-        where_clauses = []
-        
-        if week_filter:
-            where_clauses.append("week = ?")
-            params.append(week_filter)
-        
-        if date_from:
-            where_clauses.append("date >= ?")
-            params.append(date_from)
-            
-        if date_to:
-            where_clauses.append("date <= ?")
-            params.append(date_to)
-        
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-        
-        query += " ORDER BY week, day"
-        
-        data = conn.execute(query, params).fetchall()
-        conn.close()
+        repo = get_repository()
+        data = repo.list_progress(week_filter, date_from, date_to, order='program')
+        repo.close()
 
         if not data:
             return jsonify({"error": "No progress data found to export."}), 404
@@ -505,14 +1065,14 @@ def export_progress_csv():
 
         for row in data:
             writer.writerow([
-                row["week"],
-                row["day"],
-                row["fluidity"],
-                row["endurance"],
-                row["power"],
-                row["date"],
-                row["notes"] or "",
-                row["duration"] or 0
+                row.week,
+                row.day,
+                row.fluidity,
+                row.endurance,
+                row.power,
+                row.date,
+                row.notes or "",
+                row.duration or 0
             ])
 
         output.seek(0)
@@ -628,18 +1188,27 @@ def settings():
             settings_data = load_settings()
             
             # Update settings from form
-            settings_data['training_time'] = request.form.get('training_time', '09:00')
+            # Keep the previous training time rather than saving one reminders can't parse
+            try:
+                hour, minute = parse_training_time(request.form.get('training_time', DEFAULT_SETTINGS['training_time']))
+                settings_data['training_time'] = f"{hour:02d}:{minute:02d}"
+            except ValueError:
+                settings_data.setdefault('training_time', DEFAULT_SETTINGS['training_time'])
             settings_data['timezone'] = request.form.get('timezone', 'Africa/Lagos')
             settings_data['reminder_enabled'] = request.form.get('reminder_enabled') == 'on'
             settings_data['sound_enabled'] = request.form.get('sound_enabled') == 'on'
             settings_data['theme'] = request.form.get('theme', 'light')
             settings_data['auto_backup'] = request.form.get('auto_backup') == 'on'
             settings_data['max_backups'] = int(request.form.get('max_backups', 10))
+            settings_data['retention_days'] = int(request.form.get('retention_days', settings_data.get('retention_days', 0)) or 0)
             
             save_settings(settings_data)
             
             # Clean up backups if max_backups changed
             cleanup_old_backups()
+
+            # Only this athlete's reminder needs recomputing
+            reminder_scheduler.reschedule(current_athlete())
             
             return redirect(url_for('settings'))
         
@@ -657,11 +1226,13 @@ def reset_data():
         backup_file = backup_database()
         
         # Clear progress data
-        conn = get_db_connection()
-        conn.execute("DELETE FROM progress")
-        conn.execute("DELETE FROM sessions")
-        conn.commit()
-        conn.close()
+        repo = get_repository()
+        repo.delete_all()
+        repo.commit()
+        repo.close()
+
+        # Let background maintenance hand the freed pages back now rather than next cycle
+        maintenance_wakeup.set()
         
         return jsonify({"success": True, "backup": backup_file})
     except Exception as e:
@@ -679,11 +1250,25 @@ def create_backup():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/backup/create_all', methods=['POST'])
+def create_all_backups():
+    """Back up every athlete shard in parallel"""
+    try:
+        results = backup_all_shards()
+        failed = [athlete for athlete, backup_file in results.items() if backup_file is None]
+        return jsonify({
+            "success": not failed,
+            "backups": {athlete or "default": backup_file for athlete, backup_file in results.items()},
+            "failed": failed
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/backup/restore/<filename>', methods=['POST'])
 def restore_backup(filename):
     """Restore from a backup file"""
     try:
-        backup_file = BACKUP_DIR / filename
+        backup_file = get_backup_dir() / filename
         
         if not backup_file.exists():
             return jsonify({"success": False, "error": "Backup file not found"}), 404
@@ -692,7 +1277,7 @@ def restore_backup(filename):
         backup_database()
         
         # Restore the backup
-        shutil.copy2(backup_file, DB_PATH)
+        replace_database_file(backup_file)
         
         return jsonify({"success": True})
     except Exception as e:
@@ -721,7 +1306,7 @@ def upload_backup():
         backup_database()
         
         # Restore from uploaded file
-        shutil.copy2(upload_path, DB_PATH)
+        replace_database_file(upload_path)
         
         # Clean up uploaded file
         upload_path.unlink()
@@ -734,7 +1319,7 @@ def upload_backup():
 def download_backup(filename):
     """Download a backup file"""
     try:
-        backup_file = BACKUP_DIR / filename
+        backup_file = get_backup_dir() / filename
         
         if not backup_file.exists():
             return render_template('404.html', message="Backup file not found"), 404
@@ -747,76 +1332,509 @@ def download_backup(filename):
 def api_stats():
     """API endpoint for dashboard statistics"""
     try:
-        conn = get_db_connection()
-        
-        # Get total sessions completed
-        total = conn.execute("SELECT COUNT(*) as count FROM progress").fetchone()['count']
-        
-        # Get current week progress
-        current_week_data = conn.execute(
-            "SELECT COUNT(*) as count FROM progress WHERE week = (SELECT MAX(week) FROM progress)"
-        ).fetchone()
-        current_week = current_week_data['count'] if current_week_data else 0
-        
-        # Get recent progress
-        recent = conn.execute(
-            "SELECT week, day, fluidity, endurance, power, date, notes, duration FROM progress ORDER BY date DESC LIMIT 5"
-        ).fetchall()
-        
-        # Get averages
-        averages = conn.execute(
-            "SELECT AVG(fluidity) as fluidity, AVG(endurance) as endurance, AVG(power) as power FROM progress"
-        ).fetchone()
-        
-        # Get total training time
-        total_duration = conn.execute("SELECT SUM(duration) as total FROM progress").fetchone()['total'] or 0
-        
-        conn.close()
-        
-        return jsonify({
-            "total_sessions": total,
-            "current_week_progress": current_week,
-            "total_training_minutes": total_duration,
-            "recent_sessions": [dict(row) for row in recent],
-            "averages": {
-                "fluidity": round(averages['fluidity'] or 0, 2),
-                "endurance": round(averages['endurance'] or 0, 2),
-                "power": round(averages['power'] or 0, 2)
-            }
-        })
+        return jsonify(read_stats(current_athlete()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def read_stats(athlete=None):
+    """Dashboard statistics, all read from one snapshot so the numbers agree"""
+    repo = get_report_repository(athlete)
+    try:
+        with repo.snapshot():
+            # Get total sessions completed
+            total = repo.count()
+
+            # Get current week progress
+            current_week = repo.count_current_week()
+
+            # Get recent progress
+            recent = repo.recent(STATS_RECENT_SESSIONS)
+
+            # Get averages
+            averages = repo.averages()
+
+            # Get total training time
+            total_duration = repo.total_duration()
+    finally:
+        repo.close()
+
+    return {
+        "total_sessions": total,
+        "current_week_progress": current_week,
+        "total_training_minutes": total_duration,
+        "recent_sessions": recent,
+        "averages": {metric: round(value, 2) for metric, value in averages.items()}
+    }
+
 @app.route('/api/progress_chart')
 def api_progress_chart():
     """API endpoint for progress chart data"""
     try:
-        conn = get_db_connection()
-        
         # Get filter parameters
         week_filter = request.args.get('week', type=int)
         
-        query = "SELECT week, day, fluidity, endurance, power, date FROM progress"
-        params = []
-        
-        if week_filter:
-            query += " WHERE week = ?"
-            params.append(week_filter)
-            
-        query += " ORDER BY week, day"
-        
-        data = conn.execute(query, params).fetchall()
-        conn.close()
-        
-        chart_data = {
-            "labels": [f"W{row['week']}D{row['day']}" for row in data],
-            "fluidity": [row['fluidity'] for row in data],
-            "endurance": [row['endurance'] for row in data],
-            "power": [row['power'] for row in data],
-            "dates": [row['date'] for row in data]
+        return jsonify(read_progress_chart(current_athlete(), week_filter))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def read_progress_chart(athlete=None, week_filter=None):
+    """Progress rows shaped into chart series"""
+    repo = get_report_repository(athlete)
+    try:
+        data = repo.list_progress(week_filter, order='program')
+    finally:
+        repo.close()
+
+    return {
+        "labels": [f"W{row['week']}D{row['day']}" for row in data],
+        "fluidity": [row['fluidity'] for row in data],
+        "endurance": [row['endurance'] for row in data],
+        "power": [row['power'] for row in data],
+        "dates": [row['date'] for row in data]
+    }
+
+def get_data_version(repo):
+    """Return a token that changes whenever progress data changes (writes, deletes, archiving or restores)"""
+    db_path = get_db_path()
+    stat = db_path.stat() if db_path.exists() else None
+    # The sync epoch tells apart databases whose files (or lack of one, in memory) look alike.
+    # Archiving skips the change log and, under WAL, may not touch the main file until a
+    # checkpoint, so its running total is part of the token too.
+    return (repo.sync_cursor(), stat.st_mtime_ns if stat else 0, stat.st_size if stat else 0,
+            repo.sync_epoch(), repo.archived_rows())
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def compute_analytics(repo):
+    """Compute rolling averages, trends, bests, percentiles and training load for all progress"""
+    # Per-session series with rolling averages computed by SQLite window functions
+    rows = repo.analytics_series()
+
+    # Least-squares slope per metric (score change per session), summed in one pass by SQLite
+    sums = repo.analytics_trend_sums()
+
+    # Calendar-week training load with week-over-week deltas via LAG
+    weekly = repo.analytics_weekly()
+
+    n = sums['n']
+    denominator = n * (sums['sxx'] or 0) - (sums['sx'] or 0) ** 2
+    metrics = {}
+    for metric in ANALYTICS_METRICS:
+        values = [row[metric] for row in rows]
+        ordered = sorted(values)
+        slope = 0
+        if denominator:
+            slope = (n * sums[f'sx_{metric}'] - sums['sx'] * sums[f's_{metric}']) / denominator
+        best = max(rows, key=lambda row: row[metric]) if rows else None
+
+        metrics[metric] = {
+            "rolling_7": round(rows[-1][f'{metric}_7'], 2) if rows else 0,
+            "rolling_28": round(rows[-1][f'{metric}_28'], 2) if rows else 0,
+            "trend_slope": round(slope, 4),
+            "personal_best": {
+                "value": best[metric],
+                "week": best['week'],
+                "day": best['day'],
+                "date": best['date']
+            } if best else None,
+            "percentiles": {f"p{pct}": round(percentile(ordered, pct), 2) for pct in ANALYTICS_PERCENTILES}
         }
-        
-        return jsonify(chart_data)
+
+    def rounded(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "sessions": n,
+        "metrics": metrics,
+        "series": {
+            "labels": [f"W{row['week']}D{row['day']}" for row in rows],
+            "dates": [row['date'] for row in rows],
+            "load": [round(row['load'], 2) for row in rows],
+            **{f"{metric}_{window}": [round(row[f'{metric}_{window}'], 2) for row in rows]
+               for metric in ANALYTICS_METRICS for window in (7, 28)}
+        },
+        "training_load": {
+            "total": round(sum(row['load'] for row in rows), 2),
+            "weekly": [{
+                "period": row['period'],
+                "sessions": row['sessions'],
+                "load": rounded(row['load']),
+                "load_delta": rounded(row['load_delta']),
+                **{f"{metric}_delta": rounded(row[f'{metric}_delta']) for metric in ANALYTICS_METRICS}
+            } for row in weekly]
+        }
+    }
+
+@app.route('/api/analytics')
+def api_analytics():
+    """API endpoint for rolling averages, trends, personal bests, percentiles and training load"""
+    try:
+        repo = get_report_repository()
+
+        # One snapshot, so the cached analytics always match the version they're stored under
+        with repo.snapshot():
+            version = get_data_version(repo)
+
+            # Recompute only when the underlying data has changed
+            shard = str(get_db_path())
+            analytics = _analytics_cache.get(shard, version)
+            if analytics is None:
+                analytics = compute_analytics(repo)
+                _analytics_cache.put(shard, version, analytics)
+        repo.close()
+
+        return jsonify({"data_version": version[0], **analytics})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def client_timestamp(value):
+    """Normalise a client-supplied timestamp to the naive local time every server write uses"""
+    if not value:
+        return datetime.now().isoformat()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date: {value}")
+    if parsed.tzinfo is None:
+        return value
+    return parsed.astimezone().replace(tzinfo=None).isoformat()
+
+def format_sync_cursor(epoch, seq):
+    return f"{epoch}.{seq}"
+
+def parse_sync_cursor(value, epoch):
+    """Change log sequence in a client cursor; 0 (full resync) if it is missing or from another epoch"""
+    cursor_epoch, _, seq = (value or "").partition(".")
+    if cursor_epoch != epoch or not seq.isdigit():
+        return 0
+    return int(seq)
+
+def apply_sync_mutation(repo, mutation):
+    """Apply one client-queued mutation through the given repository and return its result"""
+    op = mutation.get('op')
+    data = mutation.get('data') or {}
+    if not isinstance(data, dict):
+        raise ValueError("Mutation data must be an object")
+
+    if op in ('save_progress', 'add_manual_session'):
+        if not data.get('week') or not data.get('day'):
+            raise ValueError("Week and day are required")
+        recorded_at = client_timestamp(data.get('date'))
+        # Round telemetry rides along with the save so it queues (and replays) with it offline
+        telemetry = encode_telemetry(data['rounds']) if data.get('rounds') else None
+        row_id = repo.add(data['week'], data['day'],
+                          data.get('fluidity', 0), data.get('endurance', 0), data.get('power', 0),
+                          recorded_at, data.get('notes', ''), data.get('duration', 0),
+                          replace=op == 'save_progress')
+        if telemetry is None:
+            return {"id": row_id}
+        telemetry_id = repo.add_telemetry(row_id, data['week'], data['day'], recorded_at,
+                                          len(data['rounds']), telemetry[0])
+        return {"id": row_id, "telemetry_id": telemetry_id}
+
+    if op == 'delete_session':
+        if 'id' not in data:
+            raise ValueError("Session id is required")
+        return {"deleted": repo.delete(data['id'])}
+
+    raise ValueError(f"Unknown sync operation: {op}")
+
+@app.route('/api/sync', methods=['GET'])
+def api_sync_pull():
+    """API endpoint returning progress rows changed or deleted since a sync cursor"""
+    try:
+        limit = max(1, min(request.args.get('limit', SYNC_PAGE_SIZE, type=int), SYNC_PAGE_SIZE))
+
+        repo = get_repository()
+        epoch = repo.sync_epoch()
+        since = parse_sync_cursor(request.args.get('since'), epoch)
+        if since < repo.sync_floor():
+            # Deletes this client hasn't seen were compacted away
+            since = 0
+
+        if since <= 0:
+            # No cursor yet, or one from before a restore - hand the client a full snapshot to
+            # start from. The cursor is read first so nothing written in between is missed.
+            cursor = repo.sync_cursor()
+            rows = repo.all_by_id()
+            repo.close()
+
+            return jsonify({
+                "cursor": format_sync_cursor(epoch, cursor),
+                "full": True,
+                "has_more": False,
+                "changes": rows,
+                "deleted": []
+            })
+
+        # Collapse the log to the latest change per row, then page through it by sequence
+        rows = repo.changes_since(since, limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        cursor = rows[-1]['seq'] if rows else max(since, repo.sync_cursor())
+        repo.close()
+
+        changes = []
+        deleted = []
+        for row in rows:
+            if row['id'] is None:
+                deleted.append(row['row_id'])
+            else:
+                change = dict(row)
+                del change['seq'], change['row_id']
+                changes.append(change)
+
+        return jsonify({
+            "cursor": format_sync_cursor(epoch, cursor),
+            "full": False,
+            "has_more": has_more,
+            "changes": changes,
+            "deleted": deleted
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/sync', methods=['POST'])
+def api_sync_push():
+    """API endpoint applying a batch of client-queued mutations with idempotency keys"""
+    try:
+        data = request.json or {}
+        mutations = data.get('mutations', []) if isinstance(data, dict) else None
+
+        if not isinstance(mutations, list):
+            return jsonify({"success": False, "error": "Mutations must be a list"}), 400
+        if len(mutations) > SYNC_PAGE_SIZE:
+            return jsonify({"success": False, "error": f"At most {SYNC_PAGE_SIZE} mutations per batch"}), 400
+
+        repo = get_repository()
+        results = []
+        applied = 0
+
+        try:
+            # Apply the whole batch in a single transaction
+            with repo.transaction():
+                for mutation in mutations:
+                    key = mutation.get('key') if isinstance(mutation, dict) else None
+                    if not key:
+                        results.append({"key": None, "status": "error", "error": "Idempotency key is required"})
+                        continue
+
+                    # Replayed mutation (e.g. a retry after a dropped response) - return the original result
+                    existing = repo.find_mutation(key)
+                    if existing is not None:
+                        results.append({"key": key, "status": "duplicate", **existing})
+                        continue
+
+                    # Each mutation gets its own savepoint so one bad entry doesn't sink the batch.
+                    # Only bad client data is reported per mutation; lock, busy and I/O errors
+                    # abort the whole batch with a 500 so the client keeps it queued and retries.
+                    try:
+                        with repo.savepoint("sync_mutation"):
+                            result = apply_sync_mutation(repo, mutation)
+                            repo.record_mutation(key, result)
+                    except (ValueError, KeyError, TypeError, sqlite3.IntegrityError, sqlite3.ProgrammingError) as e:
+                        results.append({"key": key, "status": "error", "error": str(e)})
+                        continue
+                    results.append({"key": key, "status": "applied", **result})
+                    applied += 1
+        finally:
+            repo.close()
+
+        # One backup per batch rather than one per mutation
+        if applied and load_settings().get('auto_backup', True):
+            backup_database()
+
+        # No cursor here: the change log may also hold other clients' writes this client
+        # hasn't pulled yet, so only GET /api/sync may advance a client's cursor
+        return jsonify({"success": True, "results": results})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def is_whole_number(value):
+    """True for ints (not bools) and for floats with no fractional part"""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+def parse_session_slot(week, day):
+    """Validate a client-supplied program week and day, returning them as ints"""
+    for name, value, limit in (('Week', week, PROGRAM_WEEKS), ('Day', day, PROGRAM_DAYS)):
+        if not is_whole_number(value) or not 1 <= value <= limit:
+            raise ValueError(f"{name} must be a whole number between 1 and {limit}")
+    return int(week), int(day)
+
+def encode_telemetry(rounds):
+    """Pack per-round samples into a zlib-compressed blob of delta-encoded int32s.
+
+    Layout: a little-endian (version, round count) header followed by one
+    int32 per field per round, each the difference from the previous round.
+    """
+    if not isinstance(rounds, list) or not rounds:
+        raise ValueError("At least one round is required")
+    if len(rounds) > TELEMETRY_MAX_ROUNDS:
+        raise ValueError(f"At most {TELEMETRY_MAX_ROUNDS} rounds per session")
+
+    samples = array('i')
+    previous = [0] * len(TELEMETRY_FIELDS)
+    for round_data in rounds:
+        if not isinstance(round_data, dict):
+            raise ValueError("Each round must be an object")
+        for index, field in enumerate(TELEMETRY_FIELDS):
+            # Fields a client doesn't measure may be left out; they are stored as 0
+            value = round_data.get(field)
+            value = 0 if value is None else value
+            # Samples are stored as int32s, so fractions would be silently truncated
+            if not is_whole_number(value) or not 0 <= value <= TELEMETRY_MAX_VALUE:
+                raise ValueError(f"{field} must be a whole number between 0 and {TELEMETRY_MAX_VALUE}")
+            value = int(value)
+            samples.append(value - previous[index])
+            previous[index] = value
+
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    raw = struct.pack(TELEMETRY_HEADER, TELEMETRY_FORMAT_VERSION, len(rounds)) + samples.tobytes()
+    return zlib.compress(raw, 9), len(raw)
+
+def iter_telemetry(payload, chunk_size=4096):
+    """Stream rounds out of a telemetry blob without inflating it all at once"""
+    decompressor = zlib.decompressobj()
+    header_size = struct.calcsize(TELEMETRY_HEADER)
+    record_size = array('i').itemsize * len(TELEMETRY_FIELDS)
+    buffer = b''
+    remaining = None
+    values = [0] * len(TELEMETRY_FIELDS)
+
+    for offset in range(0, len(payload), chunk_size):
+        buffer += decompressor.decompress(payload[offset:offset + chunk_size])
+
+        if remaining is None:
+            if len(buffer) < header_size:
+                continue
+            version, remaining = struct.unpack(TELEMETRY_HEADER, buffer[:header_size])
+            if version != TELEMETRY_FORMAT_VERSION:
+                raise ValueError(f"Unsupported telemetry format version: {version}")
+            buffer = buffer[header_size:]
+
+        usable = len(buffer) - len(buffer) % record_size
+        deltas = array('i', buffer[:usable])
+        buffer = buffer[usable:]
+        if sys.byteorder == 'big':
+            deltas.byteswap()
+
+        for start in range(0, len(deltas), len(TELEMETRY_FIELDS)):
+            if remaining == 0:
+                return
+            for index in range(len(TELEMETRY_FIELDS)):
+                values[index] += deltas[start + index]
+            remaining -= 1
+            yield dict(zip(TELEMETRY_FIELDS, values))
+
+def summarize_telemetry(payloads):
+    """Aggregate totals, maxima and per-round averages over a stream of telemetry blobs"""
+    totals = dict.fromkeys(TELEMETRY_FIELDS, 0)
+    maxima = dict.fromkeys(TELEMETRY_FIELDS, 0)
+    rounds = 0
+    for payload in payloads:
+        for round_data in iter_telemetry(payload):
+            rounds += 1
+            for field in TELEMETRY_FIELDS:
+                totals[field] += round_data[field]
+                maxima[field] = max(maxima[field], round_data[field])
+
+    return {
+        "rounds": rounds,
+        "totals": totals,
+        "max": maxima,
+        "averages": {field: round(totals[field] / rounds, 2) if rounds else 0 for field in TELEMETRY_FIELDS}
+    }
+
+@app.route('/api/telemetry', methods=['POST'])
+def save_telemetry():
+    """Store per-round telemetry for a session as one packed row"""
+    try:
+        data = request.json
+        if not isinstance(data, dict):
+            return jsonify({"success": False, "error": "Request body must be an object"}), 400
+
+        try:
+            week, day = parse_session_slot(data.get('week'), data.get('day'))
+            payload, raw_size = encode_telemetry(data.get('rounds'))
+            recorded_at = client_timestamp(data.get('date'))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        progress_id = data.get('progress_id')
+        repo = get_repository()
+        try:
+            if not is_whole_number(progress_id) or not repo.progress_exists(progress_id):
+                return jsonify({"success": False, "error": "progress_id must name a saved session"}), 400
+            telemetry_id = repo.add_telemetry(int(progress_id), week, day, recorded_at,
+                                              len(data['rounds']), payload)
+            repo.commit()
+        finally:
+            repo.close()
+
+        return jsonify({
+            "success": True,
+            "id": telemetry_id,
+            "rounds": len(data['rounds']),
+            "raw_bytes": raw_size,
+            "stored_bytes": len(payload)
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/telemetry/<int:telemetry_id>')
+def get_telemetry(telemetry_id):
+    """Return the decoded rounds of one telemetry record"""
+    try:
+        repo = get_repository()
+        row = repo.find_telemetry(telemetry_id)
+        repo.close()
+
+        if not row:
+            return jsonify({"error": "Telemetry not found"}), 404
+
+        return jsonify({
+            "id": row['id'],
+            "progress_id": row['progress_id'],
+            "week": row['week'],
+            "day": row['day'],
+            "recorded_at": row['recorded_at'],
+            "rounds": list(iter_telemetry(row['payload']))
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/telemetry/aggregate')
+def api_telemetry_aggregate():
+    """API endpoint aggregating per-round telemetry across sessions"""
+    try:
+        week_filter = request.args.get('week', type=int)
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+
+        repo = get_repository()
+        sessions = 0
+
+        # Decode blob by blob so memory stays flat however many sessions match
+        def payloads():
+            nonlocal sessions
+            for payload in repo.iter_telemetry_payloads(week_filter, date_from, date_to):
+                sessions += 1
+                yield payload
+
+        summary = summarize_telemetry(payloads())
+        repo.close()
+
+        return jsonify({"sessions": sessions, **summary})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -824,54 +1842,79 @@ def api_progress_chart():
 def api_metadata():
     """API endpoint for app metadata"""
     try:
-        conn = get_db_connection()
-        
-        # Get database stats
-        total_sessions = conn.execute("SELECT COUNT(*) as count FROM progress").fetchone()['count']
-        last_session = conn.execute("SELECT date FROM progress ORDER BY date DESC LIMIT 1").fetchone()
-        db_size = DB_PATH.stat().st_size if DB_PATH.exists() else 0
-        
-        conn.close()
-        
-        return jsonify({
-            "app_name": APP_NAME,
-            "version": APP_VERSION,
-            "database": {
-                "sessions_count": total_sessions,
-                "last_session": last_session['date'] if last_session else None,
-                "size_bytes": db_size,
-                "size_mb": round(db_size / (1024 * 1024), 2) if db_size > 0 else 0
-            },
-            "backups": {
-                "count": len(list(BACKUP_DIR.glob("peekaboo_backup_*.db"))),
-                "location": str(BACKUP_DIR)
-            },
-            "settings": {
-                "file_exists": SETTINGS_PATH.exists(),
-                "location": str(SETTINGS_PATH)
-            }
-        })
+        return jsonify(read_metadata(current_athlete()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def read_metadata(athlete=None):
+    """App metadata: database stats from one snapshot, plus file and backup details from disk"""
+    repo = get_report_repository(athlete)
+    try:
+        with repo.snapshot():
+            total_sessions = repo.count()
+            last_session = repo.last_session_date()
+            free_pages, page_size = repo.free_pages()
+            maintenance = repo.maintenance_stats()
+            archived_weeks = repo.archived_weeks()
+    finally:
+        repo.close()
+
+    # Recent commits live in the -wal file until a checkpoint, so count it with the main file
+    db_path = get_db_path(athlete)
+    db_size = sum(path.stat().st_size for path in (db_path, Path(f"{db_path}-wal")) if path.exists())
+    backup_dir = get_backup_dir(athlete)
+    settings_path = get_settings_path(athlete)
+
+    return {
+        "app_name": APP_NAME,
+        "version": APP_VERSION,
+        "database": {
+            "sessions_count": total_sessions,
+            "last_session": last_session,
+            "size_bytes": db_size,
+            "size_mb": round(db_size / (1024 * 1024), 2) if db_size > 0 else 0,
+            "free_pages": free_pages,
+            "free_bytes": free_pages * page_size,
+            "reclaimed_bytes": maintenance.get('reclaimed_bytes', 0),
+            "archived_rows": maintenance.get('archived_rows', 0),
+            "archived_weeks": archived_weeks
+        },
+        "backups": {
+            "count": len(list(backup_dir.glob("peekaboo_backup_*.db"))),
+            "location": str(backup_dir)
+        },
+        "settings": {
+            "file_exists": settings_path.exists(),
+            "location": str(settings_path)
+        }
+    }
+
 @app.route('/api/reminders')
 def api_reminders():
     """API endpoint for reminder status"""
     try:
-        settings = load_settings()
-        
-        # Simple reminder logic - in a real app, this would check actual training times
-        reminder_status = {
-            "enabled": settings.get('reminder_enabled', True),
-            "training_time": settings.get('training_time', '09:00'),
-            "timezone": settings.get('timezone', 'Africa/Lagos'),
-            "next_check": (datetime.now() + timedelta(hours=1)).isoformat()
-        }
-        
-        return jsonify(reminder_status)
+        return jsonify(reminder_report(current_athlete()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def reminder_report(athlete):
+    """Reminder status for an athlete"""
+    settings = load_settings(athlete)
+    enabled = settings.get('reminder_enabled', True)
+
+    # Prefer the leader's live entry; everywhere else compute it fresh from the settings
+    next_reminder = None
+    if enabled:
+        next_reminder = reminder_scheduler.next_fire(athlete) or next_reminder_time(settings)
+
+    return {
+        "enabled": enabled,
+        "training_time": settings.get('training_time', '09:00'),
+        "timezone": settings.get('timezone', 'Africa/Lagos'),
+        "next_check": next_reminder.isoformat() if next_reminder else None,
+        "scheduler_leader": reminder_scheduler.is_leader
+    }
+
 @app.errorhandler(404)
 def not_found(e):
     """Handle 404 errors"""
@@ -0,0 +1,127 @@
+"""
+ASGI entry point for Peek-a-Boo Boxing Tracker
+
+The read-only JSON API (/api/stats, /api/progress_chart, /api/metadata and
+/api/reminders) is served natively on the event loop so idle or slow clients
+only cost a coroutine, not a worker thread. SQLite and filesystem work is
+offloaded to a bounded thread pool; each report runs its queries back to back
+inside one read-only snapshot, and concurrent requests run in parallel.
+Every other route is handed to the Flask app through a2wsgi's WSGI adapter,
+which runs requests on its own pool of FLASK_WORKERS threads. asgiref's
+WsgiToAsgi is thread-sensitive and would serialise every Flask request onto a
+single thread.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+from app import (app, MULTI_ATHLETE, ATHLETE_ID_PATTERN, ATHLETE_COOKIE, ensure_athlete_shard,
+                 read_stats, read_progress_chart, read_metadata, reminder_report)
+
+# Threads available for blocking database and filesystem calls
+API_DB_WORKERS = int(os.environ.get("PEEKABOO_API_DB_WORKERS", 16))
+# Threads available for concurrent Flask (page, form and write) requests
+FLASK_WORKERS = int(os.environ.get("PEEKABOO_FLASK_WORKERS", 16))
+
+db_executor = ThreadPoolExecutor(max_workers=API_DB_WORKERS, thread_name_prefix="api-db")
+flask_app = WSGIMiddleware(app, workers=FLASK_WORKERS)
+
+class ApiError(Exception):
+    """Error answered with a JSON body and status code"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+async def run_blocking(func, *args):
+    """Run a blocking call on the database thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(func, *args))
+
+async def resolve_athlete(scope, args):
+    """Pick the athlete shard the same way the Flask before_request hook does"""
+    if not MULTI_ATHLETE:
+        return None
+
+    headers = dict(scope['headers'])
+    cookies = SimpleCookie(headers.get(b'cookie', b'').decode('latin-1'))
+    athlete = (headers.get(b'x-athlete', b'').decode('latin-1')
+               or args.get('athlete')
+               or (cookies[ATHLETE_COOKIE].value if ATHLETE_COOKIE in cookies else None))
+    if not athlete or not ATHLETE_ID_PATTERN.match(athlete):
+        raise ApiError("A valid athlete must be selected (X-Athlete header, ?athlete= or /athlete/<id>)")
+
+    await run_blocking(ensure_athlete_shard, athlete)
+    return athlete
+
+async def api_stats(athlete, args):
+    return await run_blocking(read_stats, athlete)
+
+async def api_progress_chart(athlete, args):
+    week_filter = args.get('week')
+    week_filter = int(week_filter) if week_filter and week_filter.isdigit() else None
+    return await run_blocking(read_progress_chart, athlete, week_filter)
+
+async def api_metadata(athlete, args):
+    # File stats and the backup directory listing block too, so the whole report is offloaded
+    return await run_blocking(read_metadata, athlete)
+
+async def api_reminders(athlete, args):
+    return await run_blocking(reminder_report, athlete)
+
+API_ROUTES = {
+    '/api/stats': api_stats,
+    '/api/progress_chart': api_progress_chart,
+    '/api/metadata': api_metadata,
+    '/api/reminders': api_reminders,
+}
+
+async def send_json(send, payload, status=200):
+    body = app.json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # Let in-flight queries finish without blocking the event loop while they do
+            await asyncio.to_thread(db_executor.shutdown, wait=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    """ASGI callable: native async JSON API, everything else through Flask"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    handler = API_ROUTES.get(scope.get('path')) if scope['type'] == 'http' else None
+    if handler is None:
+        return await flask_app(scope, receive, send)
+
+    if scope['method'] != 'GET':
+        return await send_json(send, {"error": "Method not allowed"}, 405)
+
+    args = {key: values[0] for key, values in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+    try:
+        athlete = await resolve_athlete(scope, args)
+        payload = await handler(athlete, args)
+    except ApiError as e:
+        return await send_json(send, {"error": str(e)}, e.status)
+    except Exception as e:
+        return await send_json(send, {"error": str(e)}, 500)
+
+    await send_json(send, payload)
@@ -0,0 +1,664 @@
+"""Data access for Peek-a-Boo progress data.
+
+Every SQL statement the app runs lives here as a fixed, parameterized string
+so SQLite's per-connection statement cache is hit on every call. Queries with
+optional filters get one prebuilt statement per filter combination, so each
+still uses its index, and reads come back as lightweight ``ProgressRow`` objects.
+
+``ProgressRepository.in_memory()`` gives a repository over a private
+``:memory:`` database; ``MemoryBackend`` plugs shared in-memory databases into
+the app (``app.config['REPOSITORY_BACKEND']``) so tests and benchmarks never
+touch a shard file.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import count, product
+
+
+PROGRESS_FIELDS = ('id', 'week', 'day', 'fluidity', 'endurance', 'power', 'date', 'notes', 'duration')
+PROGRESS_COLUMNS = ", ".join(PROGRESS_FIELDS)
+
+
+class ProgressRow:
+    """One progress row - attribute and item access, no per-row dict"""
+
+    __slots__ = PROGRESS_FIELDS
+
+    def __init__(self, id, week, day, fluidity, endurance, power, date, notes, duration):
+        self.id = id
+        self.week = week
+        self.day = day
+        self.fluidity = fluidity
+        self.endurance = endurance
+        self.power = power
+        self.date = date
+        self.notes = notes
+        self.duration = duration
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def keys(self):
+        return PROGRESS_FIELDS
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in PROGRESS_FIELDS}
+
+    def __repr__(self):
+        return f"ProgressRow(id={self.id}, week={self.week}, day={self.day}, date={self.date!r})"
+
+
+def _progress_row(cursor, row):
+    return ProgressRow(*row)
+
+
+# --- Statements -------------------------------------------------------------
+
+SQL_INSERT_PROGRESS = '''INSERT INTO progress
+                         (week, day, fluidity, endurance, power, date, notes, duration)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+SQL_REPLACE_PROGRESS = '''INSERT OR REPLACE INTO progress
+                          (week, day, fluidity, endurance, power, date, notes, duration)
+                          VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+SQL_DELETE_PROGRESS = "DELETE FROM progress WHERE id = ?"
+SQL_PROGRESS_EXISTS = "SELECT EXISTS (SELECT 1 FROM progress WHERE id = ?)"
+SQL_DELETE_ALL_PROGRESS = "DELETE FROM progress"
+SQL_DELETE_ALL_SESSIONS = "DELETE FROM sessions"
+
+SQL_FIND_SESSION = f'''SELECT {PROGRESS_COLUMNS} FROM progress
+                       WHERE week = ? AND day = ?
+                       ORDER BY id DESC LIMIT 1'''
+
+def _filtered_statements(select, filters, order_by=""):
+    """Prebuild one statement text per combination of optional filters, keyed by which are set"""
+    statements = {}
+    for enabled in product((False, True), repeat=len(filters)):
+        clauses = [clause for clause, on in zip(filters, enabled) if on]
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        statements[enabled] = f"{select}{where}{order_by}"
+    return statements
+
+
+def _filter_key(params):
+    return tuple(value is not None for value in params.values())
+
+
+# Plain column comparisons (not "? IS NULL OR ...") so SQLite can still pick an index
+_PROGRESS_FILTERS = ("week = :week", "date >= :date_from", "date <= :date_to")
+SQL_LIST_PROGRESS_RECENT = _filtered_statements(f"SELECT {PROGRESS_COLUMNS} FROM progress", _PROGRESS_FILTERS,
+                                                " ORDER BY date DESC, week DESC, day DESC")
+SQL_LIST_PROGRESS_PROGRAM = _filtered_statements(f"SELECT {PROGRESS_COLUMNS} FROM progress", _PROGRESS_FILTERS,
+                                                 " ORDER BY week, day")
+SQL_LIST_PROGRESS_BY_ID = f"SELECT {PROGRESS_COLUMNS} FROM progress ORDER BY id"
+SQL_RECENT_PROGRESS = f"SELECT {PROGRESS_COLUMNS} FROM progress ORDER BY date DESC LIMIT ?"
+
+SQL_COUNT_PROGRESS = "SELECT COUNT(*) FROM progress"
+SQL_COUNT_CURRENT_WEEK = "SELECT COUNT(*) FROM progress WHERE week = (SELECT MAX(week) FROM progress)"
+SQL_AVERAGES = "SELECT AVG(fluidity), AVG(endurance), AVG(power) FROM progress"
+SQL_TOTAL_DURATION = "SELECT SUM(duration) FROM progress"
+SQL_LAST_SESSION_DATE = "SELECT date FROM progress ORDER BY date DESC LIMIT 1"
+
+SQL_COMPLETED_SLOTS = "SELECT week, day FROM sessions WHERE week BETWEEN 1 AND ? AND day BETWEEN 1 AND ?"
+
+# Progress with unrated (NULL) scores counted as 0, the same default every write path uses;
+# analytics sorts, compares and rounds the scores, none of which can take a NULL
+SCORED_PROGRESS = '''(SELECT id, week, day, date, duration,
+                            COALESCE(fluidity, 0) as fluidity, COALESCE(endurance, 0) as endurance,
+                            COALESCE(power, 0) as power
+                     FROM progress)'''
+SQL_ANALYTICS_SERIES = f'''SELECT week, day, date,
+                                 fluidity, endurance, power,
+                                 COALESCE(duration, 0) as duration,
+                                 COALESCE(duration, 0) * (fluidity + endurance + power) / 3.0 as load,
+                                 AVG(fluidity) OVER w7 as fluidity_7, AVG(fluidity) OVER w28 as fluidity_28,
+                                 AVG(endurance) OVER w7 as endurance_7, AVG(endurance) OVER w28 as endurance_28,
+                                 AVG(power) OVER w7 as power_7, AVG(power) OVER w28 as power_28
+                          FROM {SCORED_PROGRESS}
+                          WINDOW w7 AS (ORDER BY date, id ROWS BETWEEN 6 PRECEDING AND CURRENT ROW),
+                                 w28 AS (ORDER BY date, id ROWS BETWEEN 27 PRECEDING AND CURRENT ROW)
+                          ORDER BY date, id'''
+SQL_ANALYTICS_TREND_SUMS = f'''WITH s AS (SELECT ROW_NUMBER() OVER (ORDER BY date, id) as x,
+                                                fluidity, endurance, power FROM {SCORED_PROGRESS})
+                              SELECT COUNT(*) as n, SUM(x) as sx, SUM(x * x) as sxx,
+                                     SUM(fluidity) as s_fluidity, SUM(x * fluidity) as sx_fluidity,
+                                     SUM(endurance) as s_endurance, SUM(x * endurance) as sx_endurance,
+                                     SUM(power) as s_power, SUM(x * power) as sx_power
+                              FROM s'''
+SQL_ANALYTICS_WEEKLY = f'''WITH w AS (SELECT strftime('%Y-%W', date) as period,
+                                            COUNT(*) as sessions,
+                                            SUM(COALESCE(duration, 0) * (fluidity + endurance + power) / 3.0) as load,
+                                            AVG(fluidity) as fluidity, AVG(endurance) as endurance,
+                                            AVG(power) as power
+                                     FROM {SCORED_PROGRESS}
+                                     GROUP BY period)
+                          SELECT period, sessions, load, fluidity, endurance, power,
+                                 load - LAG(load) OVER p as load_delta,
+                                 fluidity - LAG(fluidity) OVER p as fluidity_delta,
+                                 endurance - LAG(endurance) OVER p as endurance_delta,
+                                 power - LAG(power) OVER p as power_delta
+                          FROM w
+                          WINDOW p AS (ORDER BY period)
+                          ORDER BY period'''
+
+# Read from sqlite_sequence so pruning old change log rows never moves the cursor backwards
+SQL_SYNC_CURSOR = "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'change_log'), 0)"
+SQL_SYNC_FLOOR = "SELECT COALESCE((SELECT CAST(value AS INTEGER) FROM sync_meta WHERE key = 'floor'), 0)"
+SQL_RAISE_SYNC_FLOOR = '''INSERT INTO sync_meta (key, value) VALUES ('floor', ?)
+                          ON CONFLICT (key) DO UPDATE
+                          SET value = MAX(CAST(value AS INTEGER), CAST(excluded.value AS INTEGER))'''
+SQL_PRUNE_SUPERSEDED_CHANGES = '''DELETE FROM change_log
+                                  WHERE seq NOT IN (SELECT MAX(seq) FROM change_log GROUP BY table_name, row_id)'''
+SQL_LAST_EXPIRED_TOMBSTONE = '''SELECT MAX(seq) FROM change_log
+                                WHERE op = 'delete' AND changed_at < datetime('now', '-' || ? || ' days')'''
+SQL_PRUNE_TOMBSTONES = "DELETE FROM change_log WHERE op = 'delete' AND seq <= ?"
+SQL_PRUNE_MUTATIONS = "DELETE FROM sync_mutations WHERE applied_at < datetime('now', '-' || ? || ' days')"
+SQL_CHANGES_SINCE = '''SELECT c.seq, c.row_id, p.id, p.week, p.day, p.fluidity, p.endurance, p.power,
+                              p.date, p.notes, p.duration
+                       FROM (SELECT row_id, MAX(seq) as seq FROM change_log
+                             WHERE table_name = 'progress' AND seq > ?
+                             GROUP BY row_id) c
+                       LEFT JOIN progress p ON p.id = c.row_id
+                       ORDER BY c.seq
+                       LIMIT ?'''
+SQL_SYNC_EPOCH = "SELECT value FROM sync_meta WHERE key = 'epoch'"
+SQL_RESET_SYNC_EPOCH = '''INSERT INTO sync_meta (key, value) VALUES ('epoch', lower(hex(randomblob(8))))
+                          ON CONFLICT (key) DO UPDATE SET value = excluded.value'''
+SQL_FIND_MUTATION = "SELECT result FROM sync_mutations WHERE idempotency_key = ?"
+SQL_RECORD_MUTATION = "INSERT INTO sync_mutations (idempotency_key, result) VALUES (?, ?)"
+
+SQL_INSERT_TELEMETRY = '''INSERT INTO session_telemetry
+                          (progress_id, week, day, recorded_at, round_count, payload)
+                          VALUES (?, ?, ?, ?, ?, ?)'''
+SQL_FIND_TELEMETRY = '''SELECT id, progress_id, week, day, recorded_at, round_count, payload
+                        FROM session_telemetry WHERE id = ?'''
+SQL_TELEMETRY_PAYLOADS = _filtered_statements("SELECT payload FROM session_telemetry",
+                                              ("week = :week", "recorded_at >= :date_from",
+                                               "recorded_at <= :date_to"))
+
+# Weighted merge on conflict so re-archiving into an existing week keeps averages exact
+SQL_ARCHIVE_BEFORE = '''INSERT INTO progress_archive
+                        (period, sessions, avg_fluidity, avg_endurance, avg_power, total_duration,
+                         first_date, last_date, notes)
+                        SELECT strftime('%Y-%W', date) as period, COUNT(*),
+                               AVG(fluidity), AVG(endurance), AVG(power), SUM(COALESCE(duration, 0)),
+                               MIN(date), MAX(date),
+                               GROUP_CONCAT(CASE WHEN notes <> '' THEN 'W' || week || 'D' || day || ': ' || notes END, char(10))
+                        FROM progress
+                        WHERE date < ?
+                        GROUP BY period
+                        ON CONFLICT (period) DO UPDATE SET
+                            avg_fluidity = (avg_fluidity * sessions + excluded.avg_fluidity * excluded.sessions)
+                                           / (sessions + excluded.sessions),
+                            avg_endurance = (avg_endurance * sessions + excluded.avg_endurance * excluded.sessions)
+                                            / (sessions + excluded.sessions),
+                            avg_power = (avg_power * sessions + excluded.avg_power * excluded.sessions)
+                                        / (sessions + excluded.sessions),
+                            sessions = sessions + excluded.sessions,
+                            total_duration = total_duration + excluded.total_duration,
+                            first_date = MIN(first_date, excluded.first_date),
+                            last_date = MAX(last_date, excluded.last_date),
+                            notes = CASE WHEN notes IS NULL THEN excluded.notes
+                                         WHEN excluded.notes IS NULL THEN notes
+                                         ELSE notes || char(10) || excluded.notes END,
+                            archived_at = CURRENT_TIMESTAMP'''
+SQL_DELETE_BEFORE = "DELETE FROM progress WHERE date < ?"
+SQL_BEGIN_ARCHIVING = "INSERT INTO archive_in_progress (active) VALUES (1)"
+SQL_END_ARCHIVING = "DELETE FROM archive_in_progress"
+SQL_COUNT_ARCHIVED_WEEKS = "SELECT COUNT(*) FROM progress_archive"
+SQL_ADD_MAINTENANCE_STAT = '''INSERT INTO maintenance_stats (key, value) VALUES (?, ?)
+                              ON CONFLICT (key) DO UPDATE SET value = value + excluded.value'''
+SQL_MAINTENANCE_STATS = "SELECT key, value FROM maintenance_stats"
+SQL_ARCHIVED_ROWS = "SELECT COALESCE((SELECT value FROM maintenance_stats WHERE key = 'archived_rows'), 0)"
+
+
+SQL_CREATE_PROGRESS = '''CREATE TABLE IF NOT EXISTS progress
+                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                          week INTEGER,
+                          day INTEGER,
+                          fluidity INTEGER,
+                          endurance INTEGER,
+                          power INTEGER,
+                          date TEXT,
+                          notes TEXT,
+                          duration INTEGER DEFAULT 0,
+                          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'''
+
+
+def _migrate_legacy_progress(c):
+    """Rebuild a progress table from before the id/duration columns in the current shape"""
+    columns = [row[1] for row in c.execute("PRAGMA table_info(progress)")]
+    if not columns or {'id', 'duration', 'created_at'} <= set(columns):
+        return
+
+    # Carry over whatever the old table had; rows keep their order (and rowid as id)
+    kept = [column for column in PROGRESS_FIELDS if column in columns and column != 'id']
+    source = ", ".join(kept)
+    c.execute("ALTER TABLE progress RENAME TO progress_legacy")
+    c.execute(SQL_CREATE_PROGRESS)
+    c.execute(f"INSERT INTO progress (id, {source}) SELECT rowid, {source} FROM progress_legacy ORDER BY rowid")
+    c.execute("DROP TABLE progress_legacy")
+
+
+ARCHIVE_GUARD = "WHEN NOT EXISTS (SELECT 1 FROM archive_in_progress)"
+
+
+def _drop_unguarded_triggers(c, names):
+    """Drop triggers created before ARCHIVE_GUARD existed so they are recreated with it"""
+    for name, sql in c.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        if name in names and 'archive_in_progress' not in sql:
+            c.execute(f"DROP TRIGGER {name}")
+
+
+def create_schema(conn):
+    """Create required tables, indexes and triggers on a fresh or existing database"""
+    c = conn.cursor()
+
+    # Incremental auto-vacuum lets maintenance hand free pages back in small steps.
+    # New databases pick it up before any table exists; older ones need a one-off VACUUM.
+    if c.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        c.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        if c.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+            c.execute("VACUUM")
+
+    # WAL lets report readers keep a stable snapshot while the writer commits
+    c.execute("PRAGMA journal_mode = WAL")
+
+    # Progress table
+    _migrate_legacy_progress(c)
+    c.execute(SQL_CREATE_PROGRESS)
+
+    # Sessions table for tracking completion
+    c.execute('''CREATE TABLE IF NOT EXISTS sessions
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  week INTEGER,
+                  day INTEGER,
+                  completed_date TEXT,
+                  duration INTEGER,
+                  UNIQUE(week, day))''')
+
+    # Create indexes for better performance
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_progress_week_day ON progress(week, day)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_progress_date ON progress(date)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_sessions_week_day ON sessions(week, day)''')
+
+    # Change log for delta sync - every write to progress appends a row here
+    c.execute('''CREATE TABLE IF NOT EXISTS change_log
+                 (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                  table_name TEXT NOT NULL,
+                  row_id INTEGER NOT NULL,
+                  op TEXT NOT NULL,
+                  changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+    # Idempotency keys of mutations already applied through /api/sync
+    c.execute('''CREATE TABLE IF NOT EXISTS sync_mutations
+                 (idempotency_key TEXT PRIMARY KEY,
+                  result TEXT,
+                  applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_change_log_row ON change_log(table_name, row_id)''')
+
+    # Sync epoch - changes whenever the database is replaced, so old cursors force a full resync
+    c.execute('''CREATE TABLE IF NOT EXISTS sync_meta
+                 (key TEXT PRIMARY KEY,
+                  value TEXT)''')
+    if not c.execute(SQL_SYNC_EPOCH).fetchone():
+        c.execute(SQL_RESET_SYNC_EPOCH)
+
+    # Triggers keep the change log in step with progress, whatever route did the write
+    # Set only inside archive_before's transaction; the delete triggers below skip archived rows
+    # so they keep their completion, telemetry and client copies
+    c.execute('''CREATE TABLE IF NOT EXISTS archive_in_progress (active INTEGER)''')
+    _drop_unguarded_triggers(c, ('trg_progress_delete', 'trg_sessions_delete', 'trg_telemetry_delete'))
+
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_progress_insert AFTER INSERT ON progress
+                 BEGIN
+                     INSERT INTO change_log (table_name, row_id, op) VALUES ('progress', NEW.id, 'upsert');
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_progress_update AFTER UPDATE ON progress
+                 BEGIN
+                     INSERT INTO change_log (table_name, row_id, op) VALUES ('progress', NEW.id, 'upsert');
+                 END''')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_progress_delete AFTER DELETE ON progress
+                 {ARCHIVE_GUARD}
+                 BEGIN
+                     INSERT INTO change_log (table_name, row_id, op) VALUES ('progress', OLD.id, 'delete');
+                 END''')
+
+    # Keep sessions (one row per completed week/day) in step with progress so the
+    # dashboard never has to scan the full history
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_sessions_insert AFTER INSERT ON progress
+                 BEGIN
+                     INSERT INTO sessions (week, day, completed_date, duration)
+                     VALUES (NEW.week, NEW.day, NEW.date, NEW.duration)
+                     ON CONFLICT (week, day) DO UPDATE SET completed_date = excluded.completed_date,
+                                                           duration = excluded.duration;
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_sessions_update AFTER UPDATE OF week, day, date, duration ON progress
+                 BEGIN
+                     DELETE FROM sessions WHERE week = OLD.week AND day = OLD.day
+                         AND NOT EXISTS (SELECT 1 FROM progress WHERE week = OLD.week AND day = OLD.day);
+                     INSERT INTO sessions (week, day, completed_date, duration)
+                     VALUES (NEW.week, NEW.day, NEW.date, NEW.duration)
+                     ON CONFLICT (week, day) DO UPDATE SET completed_date = excluded.completed_date,
+                                                           duration = excluded.duration;
+                 END''')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_sessions_delete AFTER DELETE ON progress
+                 {ARCHIVE_GUARD}
+                 BEGIN
+                     DELETE FROM sessions WHERE week = OLD.week AND day = OLD.day
+                         AND NOT EXISTS (SELECT 1 FROM progress WHERE week = OLD.week AND day = OLD.day);
+                 END''')
+
+    # Per-round telemetry - one row per session, rounds packed into a compressed blob
+    c.execute('''CREATE TABLE IF NOT EXISTS session_telemetry
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  progress_id INTEGER,
+                  week INTEGER,
+                  day INTEGER,
+                  recorded_at TEXT,
+                  round_count INTEGER,
+                  payload BLOB NOT NULL)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_telemetry_week_day ON session_telemetry(week, day)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_telemetry_progress ON session_telemetry(progress_id)''')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_telemetry_delete AFTER DELETE ON progress
+                 {ARCHIVE_GUARD}
+                 BEGIN
+                     DELETE FROM session_telemetry WHERE progress_id = OLD.id;
+                 END''')
+
+    # Retention archive - per-week aggregates (and notes) of progress rows past retention
+    c.execute('''CREATE TABLE IF NOT EXISTS progress_archive
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  period TEXT UNIQUE,
+                  sessions INTEGER,
+                  avg_fluidity REAL,
+                  avg_endurance REAL,
+                  avg_power REAL,
+                  total_duration INTEGER,
+                  first_date TEXT,
+                  last_date TEXT,
+                  notes TEXT,
+                  archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+    # Running maintenance counters (space reclaimed, rows archived)
+    c.execute('''CREATE TABLE IF NOT EXISTS maintenance_stats
+                 (key TEXT PRIMARY KEY,
+                  value INTEGER DEFAULT 0)''')
+
+    # Backfill sessions for databases written before the triggers existed
+    if not c.execute("SELECT 1 FROM sessions LIMIT 1").fetchone():
+        c.execute('''INSERT INTO sessions (week, day, completed_date, duration)
+                     SELECT week, day, MAX(date), MAX(duration) FROM progress
+                     WHERE week IS NOT NULL AND day IS NOT NULL
+                     GROUP BY week, day''')
+
+    conn.commit()
+
+
+class ProgressRepository:
+    """All reads and writes of progress data for one database connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @classmethod
+    def in_memory(cls):
+        """Repository over a fresh private in-memory database"""
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        create_schema(conn)
+        return cls(conn)
+
+    def close(self):
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    @contextmanager
+    def snapshot(self):
+        """Run a group of reads in one deferred transaction so they all see the same data"""
+        self.conn.execute("BEGIN DEFERRED")
+        try:
+            yield self
+        finally:
+            self.conn.rollback()
+
+    @contextmanager
+    def transaction(self):
+        """Run a batch of writes as one transaction: committed on success, rolled back on error.
+
+        The write lock is taken up front (BEGIN IMMEDIATE) so the busy timeout
+        applies; a deferred transaction that reads first cannot be upgraded to a
+        writer once another connection commits, and fails with "database is locked".
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    @contextmanager
+    def savepoint(self, name="unit"):
+        """Nested unit of work inside transaction(); only its own writes are undone if it raises"""
+        self.conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            self.conn.execute(f"RELEASE SAVEPOINT {name}")
+            raise
+        self.conn.execute(f"RELEASE SAVEPOINT {name}")
+
+    def _rows(self, sql, params=()):
+        cursor = self.conn.execute(sql, params)
+        cursor.row_factory = _progress_row
+        return cursor.fetchall()
+
+    def _scalar(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    # --- Progress -----------------------------------------------------------
+
+    def add(self, week, day, fluidity=0, endurance=0, power=0, date=None, notes='', duration=0, replace=False):
+        """Insert a progress row and return its id (caller commits)"""
+        cursor = self.conn.execute(SQL_REPLACE_PROGRESS if replace else SQL_INSERT_PROGRESS,
+                                   (week, day, fluidity, endurance, power, date, notes, duration))
+        return cursor.lastrowid
+
+    def delete(self, progress_id):
+        """Delete one progress row and return how many rows went (caller commits)"""
+        return self.conn.execute(SQL_DELETE_PROGRESS, (progress_id,)).rowcount
+
+    def progress_exists(self, progress_id):
+        return bool(self._scalar(SQL_PROGRESS_EXISTS, (progress_id,)))
+
+    def delete_all(self):
+        self.conn.execute(SQL_DELETE_ALL_PROGRESS)
+        self.conn.execute(SQL_DELETE_ALL_SESSIONS)
+
+    def find_session(self, week, day):
+        """Latest progress row for a program session, or None"""
+        rows = self._rows(SQL_FIND_SESSION, (week, day))
+        return rows[0] if rows else None
+
+    def list_progress(self, week=None, date_from=None, date_to=None, order='recent'):
+        """Filtered progress rows, newest first ('recent') or in program order ('program')"""
+        statements = SQL_LIST_PROGRESS_PROGRAM if order == 'program' else SQL_LIST_PROGRESS_RECENT
+        params = {"week": week or None, "date_from": date_from or None, "date_to": date_to or None}
+        return self._rows(statements[_filter_key(params)], params)
+
+    def all_by_id(self):
+        return self._rows(SQL_LIST_PROGRESS_BY_ID)
+
+    def recent(self, limit):
+        return self._rows(SQL_RECENT_PROGRESS, (limit,))
+
+    # --- Aggregates ---------------------------------------------------------
+
+    def count(self):
+        return self._scalar(SQL_COUNT_PROGRESS)
+
+    def count_current_week(self):
+        return self._scalar(SQL_COUNT_CURRENT_WEEK)
+
+    def averages(self):
+        fluidity, endurance, power = self.conn.execute(SQL_AVERAGES).fetchone()
+        return {"fluidity": fluidity or 0, "endurance": endurance or 0, "power": power or 0}
+
+    def total_duration(self):
+        return self._scalar(SQL_TOTAL_DURATION) or 0
+
+    def last_session_date(self):
+        row = self.conn.execute(SQL_LAST_SESSION_DATE).fetchone()
+        return row[0] if row else None
+
+    def completed_slots(self, max_week, max_day):
+        """(week, day) pairs completed within the program grid"""
+        return self.conn.execute(SQL_COMPLETED_SLOTS, (max_week, max_day)).fetchall()
+
+    def analytics_series(self):
+        return self.conn.execute(SQL_ANALYTICS_SERIES).fetchall()
+
+    def analytics_trend_sums(self):
+        return self.conn.execute(SQL_ANALYTICS_TREND_SUMS).fetchone()
+
+    def analytics_weekly(self):
+        return self.conn.execute(SQL_ANALYTICS_WEEKLY).fetchall()
+
+    # --- Sync ---------------------------------------------------------------
+
+    def sync_cursor(self):
+        """Latest change log sequence number (0 if nothing has changed yet)"""
+        return self._scalar(SQL_SYNC_CURSOR)
+
+    def sync_floor(self):
+        """Oldest cursor that can still be served incrementally (older tombstones were pruned)"""
+        return self._scalar(SQL_SYNC_FLOOR)
+
+    def compact_sync_log(self, retention_days):
+        """Drop superseded change log rows, tombstones and idempotency keys past retention; returns rows removed"""
+        with self.transaction():
+            # changes_since only ever reads the latest entry per row, so older ones are dead weight
+            removed = self.conn.execute(SQL_PRUNE_SUPERSEDED_CHANGES).rowcount
+            last_tombstone = self._scalar(SQL_LAST_EXPIRED_TOMBSTONE, (retention_days,))
+            if last_tombstone:
+                removed += self.conn.execute(SQL_PRUNE_TOMBSTONES, (last_tombstone,)).rowcount
+                self.conn.execute(SQL_RAISE_SYNC_FLOOR, (last_tombstone,))
+            removed += self.conn.execute(SQL_PRUNE_MUTATIONS, (retention_days,)).rowcount
+        return removed
+
+    def sync_epoch(self):
+        return self._scalar(SQL_SYNC_EPOCH)
+
+    def reset_sync_epoch(self):
+        """Start a new sync epoch (caller commits); cursors from earlier epochs become invalid"""
+        self.conn.execute(SQL_RESET_SYNC_EPOCH)
+
+    def changes_since(self, since, limit):
+        """Latest change per row after a cursor, oldest first, at most `limit` rows"""
+        return self.conn.execute(SQL_CHANGES_SINCE, (since, limit)).fetchall()
+
+    def find_mutation(self, key):
+        row = self.conn.execute(SQL_FIND_MUTATION, (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_mutation(self, key, result):
+        self.conn.execute(SQL_RECORD_MUTATION, (key, json.dumps(result)))
+
+    # --- Telemetry ----------------------------------------------------------
+
+    def add_telemetry(self, progress_id, week, day, recorded_at, round_count, payload):
+        cursor = self.conn.execute(SQL_INSERT_TELEMETRY,
+                                   (progress_id, week, day, recorded_at, round_count, payload))
+        return cursor.lastrowid
+
+    def find_telemetry(self, telemetry_id):
+        return self.conn.execute(SQL_FIND_TELEMETRY, (telemetry_id,)).fetchone()
+
+    def iter_telemetry_payloads(self, week=None, date_from=None, date_to=None):
+        """Yield matching telemetry blobs one at a time"""
+        params = {"week": week or None, "date_from": date_from or None, "date_to": date_to or None}
+        cursor = self.conn.execute(SQL_TELEMETRY_PAYLOADS[_filter_key(params)], params)
+        for row in cursor:
+            yield row[0]
+
+    # --- Retention and maintenance ------------------------------------------
+
+    def archive_before(self, cutoff):
+        """Roll progress rows dated before `cutoff` into progress_archive; returns rows archived"""
+        with self.transaction():
+            self.conn.execute(SQL_ARCHIVE_BEFORE, (cutoff,))
+            self.conn.execute(SQL_BEGIN_ARCHIVING)
+            archived = self.conn.execute(SQL_DELETE_BEFORE, (cutoff,)).rowcount
+            self.conn.execute(SQL_END_ARCHIVING)
+            if archived:
+                self.add_maintenance_stat('archived_rows', archived)
+        return archived
+
+    def archived_weeks(self):
+        return self._scalar(SQL_COUNT_ARCHIVED_WEEKS)
+
+    def archived_rows(self):
+        """Running total of rows archived; archiving bypasses the change log, so this marks it"""
+        return self._scalar(SQL_ARCHIVED_ROWS)
+
+    def free_pages(self):
+        """Return (free page count, page size)"""
+        return self._scalar("PRAGMA freelist_count"), self._scalar("PRAGMA page_size")
+
+    def incremental_vacuum(self, pages):
+        self.conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+
+    def add_maintenance_stat(self, key, value):
+        self.conn.execute(SQL_ADD_MAINTENANCE_STAT, (key, value))
+
+    def maintenance_stats(self):
+        return dict(self.conn.execute(SQL_MAINTENANCE_STATS).fetchall())
+
+
+class MemoryBackend:
+    """Shared-cache in-memory databases, one per athlete, handed out as repositories.
+
+    Every repository gets its own connection to the same named database, so
+    closing it behaves like returning a pooled connection. The backend keeps
+    one anchor connection per athlete open; the data lives until close().
+    """
+
+    _ids = count()
+
+    def __init__(self):
+        self.name = f"peekaboo-{next(self._ids)}"
+        self._anchors = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, athlete):
+        uri = f"file:{self.name}-{athlete or 'default'}?mode=memory&cache=shared"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def repository(self, athlete=None, read_only=False):
+        """Repository over a fresh connection to the athlete's database (close() when done)"""
+        with self._lock:
+            if athlete not in self._anchors:
+                anchor = self._connect(athlete)
+                create_schema(anchor)
+                self._anchors[athlete] = anchor
+
+        conn = self._connect(athlete)
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return ProgressRepository(conn)
+
+    def close(self):
+        """Drop every database this backend created"""
+        with self._lock:
+            for anchor in self._anchors.values():
+                anchor.close()
+            self._anchors.clear()
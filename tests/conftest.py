@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Keep shards in memory and background threads off before the app module is imported
+os.environ.setdefault("PEEKABOO_IN_MEMORY", "1")
+os.environ.setdefault("PEEKABOO_REMINDER_SCHEDULER", "0")
+os.environ.setdefault("PEEKABOO_MAINTENANCE", "0")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app as peekaboo
+from repository import MemoryBackend
+
+
+@pytest.fixture
+def backend():
+    """Fresh in-memory databases plugged into the app for one test"""
+    backend = MemoryBackend()
+    previous = peekaboo.app.config['REPOSITORY_BACKEND']
+    peekaboo.app.config['REPOSITORY_BACKEND'] = backend
+    yield backend
+    peekaboo.app.config['REPOSITORY_BACKEND'] = previous
+    backend.close()
+
+
+@pytest.fixture
+def client(backend):
+    return peekaboo.app.test_client()
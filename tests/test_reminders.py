@@ -0,0 +1,16 @@
+import time
+from datetime import datetime, timezone
+
+import app as peekaboo
+
+
+def test_follower_reports_a_fresh_next_check(client, monkeypatch):
+    monkeypatch.setattr(peekaboo, "load_settings", lambda athlete=None: dict(peekaboo.DEFAULT_SETTINGS))
+    # A follower's entry is filled by reschedule() but never moved forward once it fires
+    monkeypatch.setitem(peekaboo.reminder_scheduler._entries, '', time.time() - 60)
+    assert not peekaboo.reminder_scheduler.is_leader
+
+    report = client.get('/api/reminders').get_json()
+
+    assert datetime.fromisoformat(report['next_check']) > datetime.now(timezone.utc)
+    assert report['scheduler_leader'] is False
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+import app as peekaboo
+
+WRITERS = 2
+READERS = 4
+ROUNDS = 150
+DURATION = 10
+
+
+@pytest.fixture
+def file_shard(tmp_path, monkeypatch):
+    """Point the app at a WAL shard on disk so reports go through the read-only pool"""
+    monkeypatch.setattr(peekaboo, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(peekaboo, "BACKUP_DIR", tmp_path / "backup")
+    monkeypatch.setitem(peekaboo.app.config, "REPOSITORY_BACKEND", None)
+    peekaboo.DATA_DIR.mkdir()
+    peekaboo.get_repository().close()
+    yield
+    db_path = peekaboo.get_db_path()
+    peekaboo.connection_cache.discard(db_path)
+    peekaboo.read_connection_cache.discard(db_path)
+
+
+def write_pairs(writer, errors):
+    """Add two sessions, then delete two, each pair in a single transaction"""
+    try:
+        for i in range(ROUNDS):
+            repo = peekaboo.get_repository()
+            try:
+                with repo.transaction():
+                    ids = [repo.add(writer + 1, day, 5, 5, 5, f"2024-01-{i % 28 + 1:02d}T10:00:00",
+                                    duration=DURATION) for day in (1, 2)]
+                if i % 2:
+                    with repo.transaction():
+                        for progress_id in ids:
+                            repo.delete(progress_id)
+            finally:
+                repo.close()
+    except Exception as e:
+        errors.append(e)
+
+
+def check_reports(done, errors):
+    """Read the reports until the writers finish; every one must describe a single snapshot"""
+    try:
+        while not done.is_set():
+            stats = peekaboo.read_stats()
+            total = stats["total_sessions"]
+            assert total % 2 == 0
+            assert stats["total_training_minutes"] == DURATION * total
+            assert stats["current_week_progress"] <= total
+            assert len(stats["recent_sessions"]) == min(peekaboo.STATS_RECENT_SESSIONS, total)
+            if total:
+                assert stats["averages"] == {"fluidity": 5, "endurance": 5, "power": 5}
+
+            database = peekaboo.read_metadata()["database"]
+            assert database["sessions_count"] % 2 == 0
+            assert (database["last_session"] is None) == (database["sessions_count"] == 0)
+    except Exception as e:
+        errors.append(e)
+
+
+def test_reports_stay_consistent_under_concurrent_writes(file_shard):
+    errors = []
+    done = threading.Event()
+    writers = [threading.Thread(target=write_pairs, args=(n, errors)) for n in range(WRITERS)]
+    readers = [threading.Thread(target=check_reports, args=(done, errors)) for _ in range(READERS)]
+
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert not errors, errors[0]
+    stats = peekaboo.read_stats()
+    assert stats["total_sessions"] == WRITERS * ROUNDS
+    assert stats["total_training_minutes"] == DURATION * WRITERS * ROUNDS
+
+
+def test_metadata_size_includes_the_wal(file_shard):
+    repo = peekaboo.get_repository()
+    with repo.transaction():
+        for day in range(1, 6):
+            repo.add(1, day, 5, 5, 5, notes="x" * 2000, duration=DURATION)
+    repo.close()
+
+    db_path = peekaboo.get_db_path()
+    wal_size = (db_path.parent / f"{db_path.name}-wal").stat().st_size
+    assert wal_size > 0
+    assert peekaboo.read_metadata()["database"]["size_bytes"] == db_path.stat().st_size + wal_size
@@ -0,0 +1,87 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import app as peekaboo
+from repository import ProgressRepository, SQL_LIST_PROGRESS_RECENT, SQL_TELEMETRY_PAYLOADS
+
+
+def query_plan(repo, sql, params):
+    return " ".join(row[3] for row in repo.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def test_filtered_statements_use_indexes():
+    repo = ProgressRepository.in_memory()
+    params = {"week": 1, "date_from": "2024-01-01", "date_to": None}
+
+    assert "USING INDEX idx_progress_week_day" in query_plan(repo, SQL_LIST_PROGRESS_RECENT[(True, False, False)], params)
+    assert "USING INDEX idx_progress_date" in query_plan(repo, SQL_LIST_PROGRESS_RECENT[(False, True, False)], params)
+    assert "USING INDEX idx_telemetry_week_day" in query_plan(repo, SQL_TELEMETRY_PAYLOADS[(True, False, False)], params)
+    repo.close()
+
+
+def test_list_progress_filters_and_orders():
+    repo = ProgressRepository.in_memory()
+    repo.add(1, 2, 6, 6, 6, "2024-01-02")
+    repo.add(1, 1, 5, 5, 5, "2024-01-03")
+    repo.add(2, 1, 7, 7, 7, "2024-02-01")
+    repo.commit()
+
+    assert [(row.week, row.day) for row in repo.list_progress()] == [(2, 1), (1, 1), (1, 2)]
+    assert [(row.week, row.day) for row in repo.list_progress(order='program')] == [(1, 1), (1, 2), (2, 1)]
+    assert [row.week for row in repo.list_progress(week=2)] == [2]
+    assert [row.date for row in repo.list_progress(date_from="2024-01-03", date_to="2024-01-31")] == ["2024-01-03"]
+    repo.close()
+
+
+def test_read_only_repository_rejects_writes(backend):
+    reader = backend.repository(read_only=True)
+    with pytest.raises(sqlite3.OperationalError):
+        reader.add(1, 1)
+    reader.close()
+
+
+def test_routes_run_on_injected_backend(client, backend):
+    response = client.post('/save_progress', json={'week': 1, 'day': 1, 'fluidity': 8, 'endurance': 6,
+                                                   'power': 7, 'duration': 30})
+    assert response.get_json()['success']
+
+    stats = client.get('/api/stats').get_json()
+    assert stats['total_sessions'] == 1
+    assert stats['total_training_minutes'] == 30
+    assert stats['recent_sessions'][0]['fluidity'] == 8
+
+    repo = backend.repository()
+    assert repo.count() == 1
+    repo.close()
+
+
+def test_archiving_invalidates_cached_analytics(client, backend, monkeypatch):
+    repo = backend.repository()
+    repo.add(1, 1, 5, 5, 5, "2020-01-01T10:00:00")
+    repo.add(1, 2, 6, 6, 6, "2020-01-02T10:00:00")
+    repo.add(2, 1, 7, 7, 7, datetime.now().isoformat())
+    repo.commit()
+    repo.close()
+    assert client.get('/api/analytics').get_json()['sessions'] == 3
+
+    monkeypatch.setattr(peekaboo, "load_settings", lambda athlete=None: {**peekaboo.DEFAULT_SETTINGS, "retention_days": 30})
+    assert peekaboo.run_maintenance()['archived_rows'] == 2
+
+    assert client.get('/api/analytics').get_json()['sessions'] == 1
+
+
+def test_analytics_tolerate_unrated_scores(client):
+    mutations = [{'key': f'k{day}', 'op': 'add_manual_session',
+                  'data': {'week': 1, 'day': day, 'fluidity': None if day == 1 else 8, 'endurance': 6, 'power': 7,
+                           'duration': 30, 'date': f'2024-01-0{day}T10:00:00'}}
+                 for day in (1, 2)]
+    assert all(r['status'] == 'applied' for r in client.post('/api/sync', json={'mutations': mutations}).get_json()['results'])
+
+    response = client.get('/api/analytics')
+    assert response.status_code == 200
+    analytics = response.get_json()
+    assert analytics['sessions'] == 2
+    assert analytics['metrics']['fluidity']['personal_best']['value'] == 8
+    assert analytics['metrics']['fluidity']['rolling_7'] == 4
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def progress_id(backend):
+    repo = backend.repository()
+    row_id = repo.add(1, 1, 7, 7, 7, "2024-01-01T10:00:00")
+    repo.commit()
+    repo.close()
+    return row_id
+
+
+def test_telemetry_round_trip(client, progress_id):
+    rounds = [{'work_seconds': 180, 'rest_seconds': 60, 'intensity': 7.0}, {'work_seconds': 180, 'punches': 95}]
+    response = client.post('/api/telemetry', json={'week': 1, 'day': 1, 'progress_id': progress_id, 'rounds': rounds})
+    assert response.status_code == 200
+
+    stored = client.get(f"/api/telemetry/{response.get_json()['id']}").get_json()
+    assert stored['rounds'] == [
+        {'work_seconds': 180, 'rest_seconds': 60, 'intensity': 7, 'punches': 0},
+        {'work_seconds': 180, 'rest_seconds': 0, 'intensity': 0, 'punches': 95},
+    ]
+
+
+@pytest.mark.parametrize("changes", [
+    {'rounds': [{'work_seconds': 180, 'intensity': 7.9}]},
+    {'rounds': [{'work_seconds': True}]},
+    {'week': "x"},
+    {'day': 9},
+    {'progress_id': 9999},
+    {'progress_id': None},
+])
+def test_telemetry_rejects_bad_input(client, progress_id, changes):
+    body = {'week': 1, 'day': 1, 'progress_id': progress_id, 'rounds': [{'work_seconds': 180}], **changes}
+    response = client.post('/api/telemetry', json=body)
+    assert response.status_code == 400
+    assert not response.get_json()['success']
+
+
+def test_sync_save_carries_round_telemetry(client, backend):
+    mutation = {'key': 'save-1', 'op': 'save_progress',
+                'data': {'week': 1, 'day': 2, 'fluidity': 8, 'rounds': [{'work_seconds': 180, 'rest_seconds': 45}]}}
+    result = client.post('/api/sync', json={'mutations': [mutation]}).get_json()['results'][0]
+    assert result['status'] == 'applied'
+
+    stored = client.get(f"/api/telemetry/{result['telemetry_id']}").get_json()
+    assert stored['progress_id'] == result['id']
+    assert stored['rounds'] == [{'work_seconds': 180, 'rest_seconds': 45, 'intensity': 0, 'punches': 0}]
+
+    # Bad telemetry fails the save with it, so a replay can carry both again
+    mutation = {'key': 'save-2', 'op': 'save_progress',
+                'data': {'week': 1, 'day': 3, 'rounds': [{'work_seconds': 1.5}]}}
+    result = client.post('/api/sync', json={'mutations': [mutation]}).get_json()['results'][0]
+    assert result['status'] == 'error'
+    repo = backend.repository()
+    assert repo.count() == 1
+    repo.close()